@@ -0,0 +1,368 @@
+from functools import lru_cache
+from typing import *
+
+import numpy as np
+
+from kaggle_helpers import *
+
+
+# Ship actions are stored as small integer codes so a whole turn of orders fits in one array.
+# The codes reuse ShipAction values (NORTH=1, EAST=2, SOUTH=3, WEST=4, CONVERT=5), 0 means None (collect).
+NO_ACTION = 0
+SHIP_ACTION_CODES = {action.name: action.value for action in ShipAction}
+SHIP_ACTIONS = {action.value: action for action in ShipAction}
+SPAWN = ShipyardAction.SPAWN.name
+
+
+@lru_cache(maxsize=None)
+def move_table(size: int) -> np.ndarray:
+    """
+    Return a read-only (6, size * size) table where move_table(size)[code, index] is the flat index reached from
+    index by ship action code. Flat indices follow the observation layout: index = row * size + column, row 0 on top.
+    """
+    index = np.arange(size * size)
+    row, col = np.divmod(index, size)
+    table = np.empty((6, size * size), dtype=np.int64)
+    table[NO_ACTION] = index
+    table[ShipAction.NORTH.value] = (row - 1) % size * size + col
+    table[ShipAction.EAST.value] = row * size + (col + 1) % size
+    table[ShipAction.SOUTH.value] = (row + 1) % size * size + col
+    table[ShipAction.WEST.value] = row * size + (col - 1) % size
+    table[ShipAction.CONVERT.value] = index
+    table.setflags(write=False)
+    return table
+
+
+def round_halite(halite: np.ndarray, decimals: int = 3) -> np.ndarray:
+    """
+    Vectorized equivalent of [round(h, decimals) for h in halite] with bit-identical results.
+    np.round scales, rints and unscales, so it can pick the other side of a half way tie than Python's correctly
+    rounded round(); the few values sitting on a tie are re-rounded with Python's round().
+    """
+    scaled = halite * 10 ** decimals
+    result = np.rint(scaled) / 10 ** decimals
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for index in np.flatnonzero(tie):
+        result[index] = round(float(halite[index]), decimals)
+    return result
+
+
+class ArrayBoard:
+    """
+    Array backed alternative to kaggle_helpers.Board.
+
+    Cells are addressed by flat index (the observation.halite layout), so every per-cell quantity is a 1-D array of
+    length size * size. Entities are stored as parallel arrays (entity tables) in observation order, i.e. grouped by
+    player and ordered by id within each player:
+        ship_ids, ship_pos, ship_halite, ship_player, ship_action
+        shipyard_ids, shipyard_pos, shipyard_player, shipyard_action
+    Occupancy grids are derived from the tables:
+        ship_index / shipyard_index: row in the entity table, -1 if the cell is empty.
+        ship_owner / shipyard_owner: player id, -1 if the cell is empty.
+        ship_cargo: halite carried by the ship on the cell, 0 if the cell is empty.
+    Consumers should treat the arrays as read-only except ship_action and shipyard_action.
+    """
+
+    def __init__(
+        self,
+        raw_observation: Dict[str, Any],
+        raw_configuration: Union[Configuration, Dict[str, Any]],
+        next_actions: Optional[List[Dict[str, str]]] = None
+    ) -> None:
+        observation = Observation(raw_observation)
+        players = observation.players
+        next_actions = next_actions or ([{}] * len(players))
+
+        ship_ids, ship_values, ship_player, ship_action = [], [], [], []
+        shipyard_ids, shipyard_pos, shipyard_player, shipyard_action = [], [], [], []
+        for player_id, (_, player_shipyards, player_ships) in enumerate(players):
+            player_actions = next_actions[player_id] or {}
+            ship_ids.extend(player_ships.keys())
+            ship_values.extend(player_ships.values())
+            ship_player.extend([player_id] * len(player_ships))
+            ship_action.extend(SHIP_ACTION_CODES.get(player_actions.get(ship_id), NO_ACTION) for ship_id in player_ships)
+            shipyard_ids.extend(player_shipyards.keys())
+            shipyard_pos.extend(player_shipyards.values())
+            shipyard_player.extend([player_id] * len(player_shipyards))
+            shipyard_action.extend(player_actions.get(shipyard_id) == SPAWN for shipyard_id in player_shipyards)
+
+        ship_values = np.array(ship_values, dtype=np.float64).reshape(-1, 2)
+        halite = np.array(observation.halite, dtype=np.float64)
+        # Same as Board._add_shipyard, a shipyard cell holds no halite.
+        halite[shipyard_pos] = 0
+        self._set_state(
+            configuration=Configuration(raw_configuration),
+            step=observation.step,
+            current_player_id=observation.player,
+            halite=halite,
+            player_halite=np.array([player[0] for player in players], dtype=np.float64),
+            ship_ids=np.array(ship_ids, dtype=object),
+            ship_pos=ship_values[:, 0].astype(np.int64),
+            ship_halite=ship_values[:, 1],
+            ship_player=np.array(ship_player, dtype=np.int64),
+            ship_action=np.array(ship_action, dtype=np.int8),
+            shipyard_ids=np.array(shipyard_ids, dtype=object),
+            shipyard_pos=np.array(shipyard_pos, dtype=np.int64),
+            shipyard_player=np.array(shipyard_player, dtype=np.int64),
+            shipyard_action=np.array(shipyard_action, dtype=bool),
+        )
+
+    def _set_state(self, configuration, step, current_player_id, halite, player_halite,
+                   ship_ids, ship_pos, ship_halite, ship_player, ship_action,
+                   shipyard_ids, shipyard_pos, shipyard_player, shipyard_action) -> None:
+        """
+        Store the entity tables and rebuild the occupancy grids from them.
+        """
+        self._configuration = configuration
+        self.size = configuration.size
+        self.step = step
+        self.current_player_id = current_player_id
+        self.halite = halite
+        self.player_halite = player_halite
+
+        self.ship_ids = ship_ids
+        self.ship_pos = ship_pos
+        self.ship_halite = ship_halite
+        self.ship_player = ship_player
+        self.ship_action = ship_action
+
+        self.shipyard_ids = shipyard_ids
+        self.shipyard_pos = shipyard_pos
+        self.shipyard_player = shipyard_player
+        self.shipyard_action = shipyard_action
+
+        num_cells = self.size * self.size
+        self.ship_index = np.full(num_cells, -1, dtype=np.int64)
+        self.ship_index[ship_pos] = np.arange(len(ship_pos))
+        self.ship_owner = np.full(num_cells, -1, dtype=np.int64)
+        self.ship_owner[ship_pos] = ship_player
+        self.ship_cargo = np.zeros(num_cells, dtype=np.float64)
+        self.ship_cargo[ship_pos] = ship_halite
+        self.shipyard_index = np.full(num_cells, -1, dtype=np.int64)
+        self.shipyard_index[shipyard_pos] = np.arange(len(shipyard_pos))
+        self.shipyard_owner = np.full(num_cells, -1, dtype=np.int64)
+        self.shipyard_owner[shipyard_pos] = shipyard_player
+
+        self._ship_rows = None
+
+    @classmethod
+    def _from_state(cls, **state) -> 'ArrayBoard':
+        """Creates a board directly from entity tables, see _set_state."""
+        board = cls.__new__(cls)
+        board._set_state(**state)
+        return board
+
+    @property
+    def configuration(self) -> Configuration:
+        return self._configuration
+
+    @property
+    def num_players(self) -> int:
+        return len(self.player_halite)
+
+    @property
+    def halite_grid(self) -> np.ndarray:
+        """Returns a (size, size) view of the halite array, row 0 is the top (north) of the board."""
+        return self.halite.reshape(self.size, self.size)
+
+    @property
+    def moves(self) -> np.ndarray:
+        """Returns the (6, size * size) move table of this board size, see move_table."""
+        return move_table(self.size)
+
+    def to_index(self, point: Union[Tuple[int, int], Point]) -> int:
+        """Converts a 2d position (x, y) to a flat index, wrapping it around the board."""
+        x, y = point
+        return (self.size - y % self.size - 1) * self.size + x % self.size
+
+    def to_point(self, index: int) -> Point:
+        """Converts a flat index to a 2d position (x, y)."""
+        return Point.from_index(int(index), self.size)
+
+    def ship_at(self, index: int) -> Optional[int]:
+        """Returns the ship table row of the ship on the cell at index or None if the cell is empty."""
+        row = self.ship_index[index]
+        return None if row < 0 else int(row)
+
+    def shipyard_at(self, index: int) -> Optional[int]:
+        """Returns the shipyard table row of the shipyard on the cell at index or None if the cell is empty."""
+        row = self.shipyard_index[index]
+        return None if row < 0 else int(row)
+
+    def ship_row(self, ship_id: ShipId) -> Optional[int]:
+        """Returns the ship table row of ship_id or None if the ship doesn't exist."""
+        if self._ship_rows is None:
+            self._ship_rows = {ship_id: row for row, ship_id in enumerate(self.ship_ids)}
+        return self._ship_rows.get(ship_id)
+
+    def player_ships(self, player_id: PlayerId) -> np.ndarray:
+        """Returns the ship table rows owned by player_id."""
+        return np.flatnonzero(self.ship_player == player_id)
+
+    def player_shipyards(self, player_id: PlayerId) -> np.ndarray:
+        """Returns the shipyard table rows owned by player_id."""
+        return np.flatnonzero(self.shipyard_player == player_id)
+
+    @property
+    def next_actions(self) -> List[Dict[str, str]]:
+        """Returns all queued ship and shipyard actions of every player in the agent response format."""
+        actions = [{} for _ in range(self.num_players)]
+        for row in np.flatnonzero(self.ship_action):
+            actions[self.ship_player[row]][self.ship_ids[row]] = SHIP_ACTIONS[self.ship_action[row]].name
+        for row in np.flatnonzero(self.shipyard_action):
+            actions[self.shipyard_player[row]][self.shipyard_ids[row]] = SPAWN
+        return actions
+
+    @property
+    def observation(self) -> Dict[str, Any]:
+        """Converts the board back to the normalized observation that constructed it."""
+        ship_pos = self.ship_pos.tolist()
+        ship_halite = self.ship_halite.tolist()
+        shipyard_pos = self.shipyard_pos.tolist()
+        players = []
+        for player_id, player_halite in enumerate(self.player_halite.tolist()):
+            shipyards = {self.shipyard_ids[row]: shipyard_pos[row] for row in self.player_shipyards(player_id)}
+            ships = {self.ship_ids[row]: [ship_pos[row], ship_halite[row]] for row in self.player_ships(player_id)}
+            players.append([player_halite, shipyards, ships])
+        return {
+            "halite": self.halite.tolist(),
+            "players": players,
+            "player": self.current_player_id,
+            "step": self.step
+        }
+
+    def to_board(self) -> Board:
+        """Converts the board into a kaggle_helpers.Board with the same state and queued actions."""
+        return Board(self.observation, self.configuration, self.next_actions)
+
+    def next(self) -> 'ArrayBoard':
+        """
+        Returns a new board with the current board's next actions applied, the current board is unmodified.
+        Vectorized equivalent of Board.next(): ArrayBoard(obs, config, actions).next().observation is identical to
+        Board(obs, config, actions).next().observation, including generated ids and float rounding.
+        """
+        configuration = self.configuration
+        size = self.size
+        convert_cost = configuration.convert_cost
+        spawn_cost = configuration.spawn_cost
+        halite = self.halite.copy()
+        player_halite = self.player_halite.copy()
+        uid_counter = 0
+
+        # Spawns and converts depend on the running player halite, so they are resolved one entity at a time.
+        # Only entities with a SPAWN or CONVERT order are visited.
+        ship_alive = np.ones(len(self.ship_ids), dtype=bool)
+        new_ship_ids, new_ship_pos, new_ship_player = [], [], []
+        new_shipyard_ids, new_shipyard_pos, new_shipyard_player = [], [], []
+        spawn_rows = np.flatnonzero(self.shipyard_action)
+        convert_rows = np.flatnonzero(self.ship_action == ShipAction.CONVERT.value)
+        for player_id in range(self.num_players):
+            leftover_convert_halite = 0
+            for row in spawn_rows[self.shipyard_player[spawn_rows] == player_id]:
+                if player_halite[player_id] >= spawn_cost:
+                    player_halite[player_id] -= spawn_cost
+                    uid_counter += 1
+                    new_ship_ids.append(f"{self.step + 1}-{uid_counter}")
+                    new_ship_pos.append(self.shipyard_pos[row])
+                    new_ship_player.append(player_id)
+
+            for row in convert_rows[self.ship_player[convert_rows] == player_id]:
+                position = self.ship_pos[row]
+                ship_halite = self.ship_halite[row]
+                if self.shipyard_index[position] < 0 and ship_halite + player_halite[player_id] >= convert_cost:
+                    delta_halite = ship_halite - convert_cost
+                    leftover_convert_halite += max(delta_halite, 0)
+                    player_halite[player_id] += min(delta_halite, 0)
+                    uid_counter += 1
+                    new_shipyard_ids.append(f"{self.step + 1}-{uid_counter}")
+                    new_shipyard_pos.append(position)
+                    new_shipyard_player.append(player_id)
+                    halite[position] = 0
+                    ship_alive[row] = False
+
+            player_halite[player_id] += leftover_convert_halite
+            assert player_halite[player_id] >= 0
+
+        # Spawned ships are appended after the existing ships, the same order Board.next() iterates them in.
+        num_new_ships = len(new_ship_ids)
+        ship_ids = np.concatenate([self.ship_ids[ship_alive], np.array(new_ship_ids, dtype=object)])
+        ship_pos = np.concatenate([self.ship_pos[ship_alive], np.array(new_ship_pos, dtype=np.int64)])
+        ship_halite = np.concatenate([self.ship_halite[ship_alive], np.zeros(num_new_ships)])
+        ship_player = np.concatenate([self.ship_player[ship_alive], np.array(new_ship_player, dtype=np.int64)])
+        ship_action = np.concatenate([self.ship_action[ship_alive], np.zeros(num_new_ships, dtype=np.int8)])
+        shipyard_ids = np.concatenate([self.shipyard_ids, np.array(new_shipyard_ids, dtype=object)])
+        shipyard_pos = np.concatenate([self.shipyard_pos, np.array(new_shipyard_pos, dtype=np.int64)])
+        shipyard_player = np.concatenate([self.shipyard_player, np.array(new_shipyard_player, dtype=np.int64)])
+
+        # Move ships
+        moved = (ship_action >= ShipAction.NORTH.value) & (ship_action <= ShipAction.WEST.value)
+        ship_pos = move_table(size)[ship_action, ship_pos]
+        ship_halite[moved] *= (1 - configuration.move_cost)
+
+        # Ship to ship collisions: the unique ship with the least halite on a cell survives and takes the others'
+        # halite, a tie for least halite destroys every ship on the cell.
+        num_cells = size * size
+        min_halite = np.full(num_cells, np.inf)
+        np.minimum.at(min_halite, ship_pos, ship_halite)
+        smallest = ship_halite == min_halite[ship_pos]
+        num_smallest = np.bincount(ship_pos[smallest], minlength=num_cells)
+        winner = smallest & (num_smallest[ship_pos] == 1)
+        cell_halite = np.zeros(num_cells)
+        cell_halite[ship_pos[winner]] = ship_halite[winner]
+        # np.add.at accumulates in table order, the order Board.next() adds the destroyed ships' halite in.
+        np.add.at(cell_halite, ship_pos[~winner], ship_halite[~winner])
+        ship_halite = np.where(winner, cell_halite[ship_pos], ship_halite)
+        ship_alive = winner
+        ship_owner = np.full(num_cells, -1, dtype=np.int64)
+        ship_owner[ship_pos[ship_alive]] = ship_player[ship_alive]
+
+        # Ship to shipyard collisions destroy both the enemy ship and the shipyard.
+        occupant = ship_owner[shipyard_pos]
+        shipyard_alive = (occupant < 0) | (occupant == shipyard_player)
+        ship_owner[shipyard_pos[~shipyard_alive]] = -1
+        ship_alive &= ship_owner[ship_pos] >= 0
+
+        # Deposit halite from ships into shipyards
+        shipyard_grid = np.zeros(num_cells, dtype=bool)
+        shipyard_grid[shipyard_pos[shipyard_alive]] = True
+        cell_ship = np.full(num_cells, -1, dtype=np.int64)
+        cell_ship[ship_pos[ship_alive]] = np.flatnonzero(ship_alive)
+        deposit = shipyard_alive & (occupant >= 0)
+        depositing_ships = cell_ship[shipyard_pos[deposit]]
+        np.add.at(player_halite, shipyard_player[deposit], ship_halite[depositing_ships])
+        ship_halite[depositing_ships] = 0
+
+        # Collect halite from cells into ships
+        collect_pos = ship_pos[ship_alive]
+        delta_halite = np.trunc(halite[collect_pos] * configuration.collect_rate)
+        collect = ~moved[ship_alive] & ~shipyard_grid[collect_pos] & (delta_halite > 0)
+        ship_halite[np.flatnonzero(ship_alive)[collect]] += delta_halite[collect]
+        halite[collect_pos[collect]] -= delta_halite[collect]
+
+        # Regenerate halite in cells
+        empty = ship_owner < 0
+        next_halite = round_halite(halite[empty] * (1 + configuration.regen_rate))
+        halite[empty] = np.minimum(next_halite, configuration.max_cell_halite)
+        assert (halite >= 0).all()
+
+        # Restore observation order: by player, existing entities first.
+        ship_order = np.flatnonzero(ship_alive)
+        ship_order = ship_order[np.argsort(ship_player[ship_order], kind='stable')]
+        shipyard_order = np.flatnonzero(shipyard_alive)
+        shipyard_order = shipyard_order[np.argsort(shipyard_player[shipyard_order], kind='stable')]
+        return ArrayBoard._from_state(
+            configuration=configuration,
+            step=self.step + 1,
+            current_player_id=self.current_player_id,
+            halite=halite,
+            player_halite=player_halite,
+            ship_ids=ship_ids[ship_order],
+            ship_pos=ship_pos[ship_order],
+            ship_halite=ship_halite[ship_order],
+            ship_player=ship_player[ship_order],
+            ship_action=np.zeros(len(ship_order), dtype=np.int8),
+            shipyard_ids=shipyard_ids[shipyard_order],
+            shipyard_pos=shipyard_pos[shipyard_order],
+            shipyard_player=shipyard_player[shipyard_order],
+            shipyard_action=np.zeros(len(shipyard_order), dtype=bool),
+        )
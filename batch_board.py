@@ -0,0 +1,329 @@
+from typing import *
+
+import numpy as np
+
+from array_board import *
+from kaggle_helpers import *
+
+
+SHIP_TABLES = ('ship_ids', 'ship_pos', 'ship_halite', 'ship_player', 'ship_action')
+SHIPYARD_TABLES = ('shipyard_ids', 'shipyard_pos', 'shipyard_player', 'shipyard_action')
+
+
+class BatchBoard:
+    """
+    Batched simulator holding batch_size games of the same configuration and advancing all of them in one call.
+
+    The rules are those of Board.next() (see ArrayBoard.next()), applied to every game at once. Cell state is
+    stacked per game, halite is a (batch_size, size * size) array and halite_grid its (batch_size, size, size) view.
+    Entities of all games share one set of entity tables sorted by (game, player, age):
+        ship_game, ship_ids, ship_pos, ship_halite, ship_player, ship_action
+        shipyard_game, shipyard_ids, shipyard_pos, shipyard_player, shipyard_action
+    Internally a cell is keyed by game * size * size + position and a player by game * num_players + player, so
+    collisions are grouped across the whole batch with the same flat index arithmetic as a single board.
+
+    A game is done when it reaches the last step of the episode or fewer than two players are still active.
+    Done games are reset in place with a fresh observation from new_game(game), so the batch is always full.
+    """
+
+    def __init__(self, observations: List[Dict[str, Any]], raw_configuration: Union[Configuration, Dict[str, Any]],
+                 new_game: Callable[[int], Dict[str, Any]]) -> None:
+        """
+        Args:
+            observations: Initial observation of every game.
+            raw_configuration: Configuration shared by every game.
+            new_game: Called with the game index to get the initial observation of the game's next episode.
+        """
+        self._configuration = Configuration(raw_configuration)
+        self.size = self.configuration.size
+        self.batch_size = len(observations)
+        self.num_players = len(observations[0]['players'])
+        self.new_game = new_game
+
+        boards = [ArrayBoard(observation, raw_configuration) for observation in observations]
+        self.step = np.array([board.step for board in boards], dtype=np.int64)
+        self.halite = np.stack([board.halite for board in boards])
+        self.player_halite = np.stack([board.player_halite for board in boards])
+        self.episode = np.zeros(self.batch_size, dtype=np.int64)
+        # Reward of eliminated players (Kaggle's step - episode_steps - 1), nan while a player is active.
+        self.rewards = np.full((self.batch_size, self.num_players), np.nan)
+        # Start from empty entity tables of the right dtypes and fill them with every game.
+        self.ship_game = np.zeros(0, dtype=np.int64)
+        self.shipyard_game = np.zeros(0, dtype=np.int64)
+        for name in SHIP_TABLES + SHIPYARD_TABLES:
+            setattr(self, name, getattr(boards[0], name)[:0])
+        self._set_tables(boards, np.arange(self.batch_size))
+
+    @property
+    def configuration(self) -> Configuration:
+        return self._configuration
+
+    @property
+    def halite_grid(self) -> np.ndarray:
+        """Returns a (batch_size, size, size) view of the halite array, row 0 is the top (north) of the board."""
+        return self.halite.reshape(self.batch_size, self.size, self.size)
+
+    def _set_tables(self, boards: List[ArrayBoard], games: np.ndarray) -> None:
+        """
+        Replace the entities of games with those of boards (one board per game).
+        """
+        keep_ships = ~np.isin(self.ship_game, games)
+        keep_shipyards = ~np.isin(self.shipyard_game, games)
+        ship_game = np.concatenate(
+            [self.ship_game[keep_ships]] + [np.full(len(board.ship_ids), game) for board, game in zip(boards, games)])
+        shipyard_game = np.concatenate(
+            [self.shipyard_game[keep_shipyards]]
+            + [np.full(len(board.shipyard_ids), game) for board, game in zip(boards, games)]
+        )
+        ship_order = np.lexsort((np.concatenate(
+            [self.ship_player[keep_ships]] + [board.ship_player for board in boards]), ship_game))
+        shipyard_order = np.lexsort((np.concatenate(
+            [self.shipyard_player[keep_shipyards]] + [board.shipyard_player for board in boards]), shipyard_game))
+
+        self.ship_game = ship_game[ship_order]
+        for name in SHIP_TABLES:
+            table = np.concatenate([getattr(self, name)[keep_ships]] + [getattr(board, name) for board in boards])
+            setattr(self, name, table[ship_order])
+        self.shipyard_game = shipyard_game[shipyard_order]
+        for name in SHIPYARD_TABLES:
+            table = np.concatenate([getattr(self, name)[keep_shipyards]] + [getattr(board, name) for board in boards])
+            setattr(self, name, table[shipyard_order])
+        self._index()
+
+    def _index(self) -> None:
+        """
+        Rebuild the stacked occupancy grids from the entity tables.
+        """
+        shape = (self.batch_size, self.size * self.size)
+        self.ship_owner = np.full(shape, -1, dtype=np.int64)
+        self.ship_owner[self.ship_game, self.ship_pos] = self.ship_player
+        self.ship_cargo = np.zeros(shape, dtype=np.float64)
+        self.ship_cargo[self.ship_game, self.ship_pos] = self.ship_halite
+        self.shipyard_owner = np.full(shape, -1, dtype=np.int64)
+        self.shipyard_owner[self.shipyard_game, self.shipyard_pos] = self.shipyard_player
+        self._ship_rows = None
+        self._shipyard_rows = None
+
+    def board(self, game: int, player: PlayerId = 0) -> ArrayBoard:
+        """Returns a copy of one game as an ArrayBoard seen by player, including its queued actions."""
+        ships = self.ship_game == game
+        shipyards = self.shipyard_game == game
+        return ArrayBoard._from_state(
+            configuration=self.configuration,
+            step=int(self.step[game]),
+            current_player_id=player,
+            halite=self.halite[game].copy(),
+            player_halite=self.player_halite[game].copy(),
+            ship_ids=self.ship_ids[ships],
+            ship_pos=self.ship_pos[ships],
+            ship_halite=self.ship_halite[ships],
+            ship_player=self.ship_player[ships],
+            ship_action=self.ship_action[ships],
+            shipyard_ids=self.shipyard_ids[shipyards],
+            shipyard_pos=self.shipyard_pos[shipyards],
+            shipyard_player=self.shipyard_player[shipyards],
+            shipyard_action=self.shipyard_action[shipyards],
+        )
+
+    def observation(self, game: int, player: PlayerId = 0) -> Dict[str, Any]:
+        """Returns the observation of one game as seen by player."""
+        return self.board(game, player).observation
+
+    def set_actions(self, game: int, actions: Dict[str, str]) -> None:
+        """
+        Queue an agent response (ship and shipyard id -> action name) for one game.
+        """
+        if self._ship_rows is None:
+            self._ship_rows = {key: row for row, key in enumerate(zip(self.ship_game.tolist(), self.ship_ids))}
+            self._shipyard_rows = {
+                key: row for row, key in enumerate(zip(self.shipyard_game.tolist(), self.shipyard_ids))
+            }
+        for unit_id, action in actions.items():
+            if action == SPAWN and (game, unit_id) in self._shipyard_rows:
+                self.shipyard_action[self._shipyard_rows[game, unit_id]] = True
+            elif action in SHIP_ACTION_CODES and (game, unit_id) in self._ship_rows:
+                self.ship_action[self._ship_rows[game, unit_id]] = SHIP_ACTION_CODES[action]
+
+    def next(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply the queued actions of every game, then reset the games that are done.
+
+        Returns: (done, rewards), done is a (batch_size,) bool array flagging the games that ended this step and
+            rewards a (batch_size, num_players) array of their final rewards (nan for games still running).
+        """
+        configuration = self.configuration
+        size = self.size
+        num_players = self.num_players
+        num_cells = size * size
+        convert_cost = configuration.convert_cost
+        spawn_cost = configuration.spawn_cost
+        halite = self.halite.reshape(-1)
+        player_halite = self.player_halite.reshape(-1)
+        ship_key = self.ship_game * num_players + self.ship_player
+        shipyard_key = self.shipyard_game * num_players + self.shipyard_player
+
+        # Spawns: within a player the first k SPAWN orders succeed while the player can pay for them.
+        spawn_rows = np.flatnonzero(self.shipyard_action)
+        spawn_key = shipyard_key[spawn_rows]
+        spawn_rank = np.arange(len(spawn_rows)) - np.searchsorted(spawn_key, spawn_key)
+        spawned = player_halite[spawn_key] - (spawn_rank + 1) * spawn_cost >= 0
+        spawn_rows, spawn_key, spawn_rank = spawn_rows[spawned], spawn_key[spawned], spawn_rank[spawned]
+        player_halite -= np.bincount(spawn_key, minlength=len(player_halite)) * spawn_cost
+
+        # Converts depend on the running player halite and are rare, so they are resolved one ship at a time.
+        ship_alive = np.ones(len(self.ship_ids), dtype=bool)
+        shipyard_cell = np.zeros(len(halite), dtype=bool)
+        shipyard_cell[self.shipyard_game * num_cells + self.shipyard_pos] = True
+        leftover_convert_halite = np.zeros(len(player_halite))
+        convert_rows = []
+        for row in np.flatnonzero(self.ship_action == ShipAction.CONVERT.value):
+            key = ship_key[row]
+            ship_halite = self.ship_halite[row]
+            if not shipyard_cell[self.ship_game[row] * num_cells + self.ship_pos[row]] \
+                    and ship_halite + player_halite[key] >= convert_cost:
+                delta_halite = ship_halite - convert_cost
+                leftover_convert_halite[key] += max(delta_halite, 0)
+                player_halite[key] += min(delta_halite, 0)
+                ship_alive[row] = False
+                convert_rows.append(row)
+        player_halite += leftover_convert_halite
+        assert (player_halite >= 0).all()
+        convert_rows = np.array(convert_rows, dtype=np.int64)
+
+        # Ids count up per game in Board.next() order: each player's spawns, then its converts.
+        event_key = np.concatenate([spawn_key, ship_key[convert_rows]])
+        event_kind = np.concatenate([np.zeros(len(spawn_rows)), np.ones(len(convert_rows))])
+        event_order = np.concatenate([spawn_rank, np.arange(len(convert_rows))])
+        events = np.lexsort((event_order, event_kind, event_key))
+        event_game = event_key[events] // num_players
+        counter = np.empty(len(events), dtype=np.int64)
+        counter[events] = np.arange(len(events)) - np.searchsorted(event_game, event_game) + 1
+        uids = np.array(
+            [f"{step + 1}-{uid}" for step, uid in zip(self.step[event_key // num_players].tolist(), counter.tolist())],
+            dtype=object
+        )
+        spawn_uids, convert_uids = uids[:len(spawn_rows)], uids[len(spawn_rows):]
+        convert_cells = self.ship_game[convert_rows] * num_cells + self.ship_pos[convert_rows]
+        halite[convert_cells] = 0
+
+        num_new_ships = len(spawn_rows)
+        ship_game = np.concatenate([self.ship_game[ship_alive], self.shipyard_game[spawn_rows]])
+        ship_ids = np.concatenate([self.ship_ids[ship_alive], spawn_uids])
+        ship_pos = np.concatenate([self.ship_pos[ship_alive], self.shipyard_pos[spawn_rows]])
+        ship_halite = np.concatenate([self.ship_halite[ship_alive], np.zeros(num_new_ships)])
+        ship_player = np.concatenate([self.ship_player[ship_alive], self.shipyard_player[spawn_rows]])
+        ship_action = np.concatenate([self.ship_action[ship_alive], np.zeros(num_new_ships, dtype=np.int8)])
+        shipyard_game = np.concatenate([self.shipyard_game, self.ship_game[convert_rows]])
+        shipyard_ids = np.concatenate([self.shipyard_ids, convert_uids])
+        shipyard_pos = np.concatenate([self.shipyard_pos, self.ship_pos[convert_rows]])
+        shipyard_player = np.concatenate([self.shipyard_player, self.ship_player[convert_rows]])
+
+        # Move ships
+        moved = (ship_action >= ShipAction.NORTH.value) & (ship_action <= ShipAction.WEST.value)
+        ship_pos = move_table(size)[ship_action, ship_pos]
+        ship_halite[moved] *= (1 - configuration.move_cost)
+        ship_cell = ship_game * num_cells + ship_pos
+        shipyard_cell = shipyard_game * num_cells + shipyard_pos
+
+        # Ship to ship collisions, see ArrayBoard.next()
+        min_halite = np.full(len(halite), np.inf)
+        np.minimum.at(min_halite, ship_cell, ship_halite)
+        smallest = ship_halite == min_halite[ship_cell]
+        num_smallest = np.bincount(ship_cell[smallest], minlength=len(halite))
+        winner = smallest & (num_smallest[ship_cell] == 1)
+        cell_halite = np.zeros(len(halite))
+        cell_halite[ship_cell[winner]] = ship_halite[winner]
+        np.add.at(cell_halite, ship_cell[~winner], ship_halite[~winner])
+        ship_halite = np.where(winner, cell_halite[ship_cell], ship_halite)
+        ship_alive = winner
+        ship_owner = np.full(len(halite), -1, dtype=np.int64)
+        ship_owner[ship_cell[ship_alive]] = ship_player[ship_alive]
+
+        # Ship to shipyard collisions
+        occupant = ship_owner[shipyard_cell]
+        shipyard_alive = (occupant < 0) | (occupant == shipyard_player)
+        ship_owner[shipyard_cell[~shipyard_alive]] = -1
+        ship_alive &= ship_owner[ship_cell] >= 0
+
+        # Deposit halite from ships into shipyards
+        shipyard_grid = np.zeros(len(halite), dtype=bool)
+        shipyard_grid[shipyard_cell[shipyard_alive]] = True
+        cell_ship = np.full(len(halite), -1, dtype=np.int64)
+        cell_ship[ship_cell[ship_alive]] = np.flatnonzero(ship_alive)
+        deposit = shipyard_alive & (occupant >= 0)
+        depositing_ships = cell_ship[shipyard_cell[deposit]]
+        np.add.at(player_halite, (shipyard_game * num_players + shipyard_player)[deposit],
+                  ship_halite[depositing_ships])
+        ship_halite[depositing_ships] = 0
+
+        # Collect halite from cells into ships
+        collect_cell = ship_cell[ship_alive]
+        delta_halite = np.trunc(halite[collect_cell] * configuration.collect_rate)
+        collect = ~moved[ship_alive] & ~shipyard_grid[collect_cell] & (delta_halite > 0)
+        ship_halite[np.flatnonzero(ship_alive)[collect]] += delta_halite[collect]
+        halite[collect_cell[collect]] -= delta_halite[collect]
+
+        # Regenerate halite in cells
+        empty = ship_owner < 0
+        next_halite = round_halite(halite[empty] * (1 + configuration.regen_rate))
+        halite[empty] = np.minimum(next_halite, configuration.max_cell_halite)
+
+        ship_order = np.flatnonzero(ship_alive)
+        ship_order = ship_order[np.lexsort((ship_player[ship_order], ship_game[ship_order]))]
+        shipyard_order = np.flatnonzero(shipyard_alive)
+        shipyard_order = shipyard_order[np.lexsort((shipyard_player[shipyard_order], shipyard_game[shipyard_order]))]
+        self.ship_game = ship_game[ship_order]
+        self.ship_ids = ship_ids[ship_order]
+        self.ship_pos = ship_pos[ship_order]
+        self.ship_halite = ship_halite[ship_order]
+        self.ship_player = ship_player[ship_order]
+        self.ship_action = np.zeros(len(ship_order), dtype=np.int8)
+        self.shipyard_game = shipyard_game[shipyard_order]
+        self.shipyard_ids = shipyard_ids[shipyard_order]
+        self.shipyard_pos = shipyard_pos[shipyard_order]
+        self.shipyard_player = shipyard_player[shipyard_order]
+        self.shipyard_action = np.zeros(len(shipyard_order), dtype=bool)
+        self.step += 1
+        self._index()
+
+        return self._finish_games()
+
+    def _finish_games(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Eliminate players that can no longer gather halite, then score and reset the games that are done.
+        """
+        shape = (self.batch_size, self.num_players)
+        num_ships = np.bincount(self.ship_game * self.num_players + self.ship_player,
+                                minlength=self.rewards.size).reshape(shape)
+        num_shipyards = np.bincount(self.shipyard_game * self.num_players + self.shipyard_player,
+                                    minlength=self.rewards.size).reshape(shape)
+        active = np.isnan(self.rewards)
+        eliminated = active & (num_ships == 0) & (
+            (num_shipyards == 0) | (self.player_halite < self.configuration.spawn_cost))
+        self.rewards[eliminated] = np.broadcast_to(
+            (self.step - self.configuration.episode_steps - 1)[:, None], shape)[eliminated]
+        active &= ~eliminated
+
+        done = self.step >= self.configuration.episode_steps - 1
+        if self.num_players > 1:
+            done |= active.sum(axis=1) < 2
+        rewards = np.full(shape, np.nan)
+        games = np.flatnonzero(done)
+        if len(games):
+            rewards[games] = np.where(active[games], self.player_halite[games], self.rewards[games])
+            self.reset(games)
+        return done, rewards
+
+    def reset(self, games: Iterable[int]) -> None:
+        """
+        Start a new episode in each of games with an observation from new_game.
+        """
+        games = np.array(list(games), dtype=np.int64)
+        boards = [ArrayBoard(self.new_game(game), self.configuration) for game in games.tolist()]
+        for game, board in zip(games, boards):
+            self.step[game] = board.step
+            self.halite[game] = board.halite
+            self.player_halite[game] = board.player_halite
+        self.rewards[games] = np.nan
+        self.episode[games] += 1
+        self._set_tables(boards, games)
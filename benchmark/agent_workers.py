@@ -0,0 +1,34 @@
+"""
+Start cost of a game in a fresh agent process versus a persistent worker (simulator.workers.AgentWorker).
+
+Usage: python -m benchmark.agent_workers
+"""
+import time
+
+from benchmark.common import *
+from simulator.episode import agent_observation, initial_observation, make_configuration
+from simulator.workers import AgentWorker
+
+
+def first_turn(worker: AgentWorker, obs, config) -> None:
+    worker.reset()
+    worker(obs, config)
+
+
+if __name__ == '__main__':
+    config = make_configuration()
+    obs = agent_observation(initial_observation(config, 4, 0), 0)
+    for name in ['SilverBot', 'SilverBot_v4']:
+        rows = []
+        start = time.perf_counter()
+        for _ in range(3):
+            # A new interpreter per game imports the agent and builds its tables again
+            worker = AgentWorker(name, context='spawn')
+            first_turn(worker, obs, config)
+            worker.close()
+        rows.append(('fresh process per game', (time.perf_counter() - start) / 3 * 1e6))
+        worker = AgentWorker(name, context='spawn')
+        first_turn(worker, obs, config)
+        rows.append(('persistent worker', measure(lambda: first_turn(worker, obs, config), number=20, repeat=3)))
+        worker.close()
+        report(f'{name} game start and first turn', rows)
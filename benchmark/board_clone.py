@@ -0,0 +1,24 @@
+"""
+Clone cost of Board.__deepcopy__ versus the observation round trip it replaced.
+
+Usage: python -m benchmark.board_clone
+"""
+from copy import deepcopy
+
+from benchmark.common import *
+from kaggle_helpers import Board
+
+
+def round_trip(board: Board) -> Board:
+    actions = [player.next_actions for player in board.players.values()]
+    return Board(board.observation, board.configuration, actions)
+
+
+if __name__ == '__main__':
+    for num_ships in [10, 40, 100]:
+        observation = random_observation(num_ships=num_ships)
+        board = Board(observation, CONFIGURATION, random_actions(observation))
+        report(f'Board clone, {num_ships} ships', [
+            ('observation round trip', measure(lambda: round_trip(board))),
+            ('deepcopy (structural clone)', measure(lambda: deepcopy(board))),
+        ])
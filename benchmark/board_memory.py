@@ -0,0 +1,115 @@
+"""
+Memory held per Board, measured with tracemalloc over many boards built from the same observation.
+The legacy column is LegacyBoard, the construction of the original kaggle_helpers.Board.
+
+Usage: python -m benchmark.board_memory
+"""
+import tracemalloc
+from copy import deepcopy
+
+from benchmark.common import *
+from benchmark.point import LegacyPoint
+from kaggle_helpers import Board, Configuration, Observation
+
+
+class LegacyCell:
+    """The original kaggle_helpers.Cell fields, kept for comparison."""
+    def __init__(self, position, halite, shipyard_id, ship_id, board):
+        self._position = position
+        self._halite = halite
+        self._shipyard_id = shipyard_id
+        self._ship_id = ship_id
+        self._board = board
+
+
+class LegacyShip:
+    """The original kaggle_helpers.Ship fields, kept for comparison."""
+    def __init__(self, ship_id, position, halite, player_id, board, next_action=None):
+        self._id = ship_id
+        self._position = position
+        self._halite = halite
+        self._player_id = player_id
+        self._board = board
+        self._next_action = next_action
+
+
+class LegacyShipyard:
+    """The original kaggle_helpers.Shipyard fields, kept for comparison."""
+    def __init__(self, shipyard_id, position, player_id, board, next_action=None):
+        self._id = shipyard_id
+        self._position = position
+        self._player_id = player_id
+        self._board = board
+        self._next_action = next_action
+
+
+class LegacyPlayer:
+    """The original kaggle_helpers.Player fields, kept for comparison."""
+    def __init__(self, player_id, halite, shipyard_ids, ship_ids, board):
+        self._id = player_id
+        self._halite = halite
+        self._shipyard_ids = shipyard_ids
+        self._ship_ids = ship_ids
+        self._board = board
+
+
+class LegacyBoard:
+    """
+    The original kaggle_helpers.Board construction, kept for comparison: entities without __slots__ that refer to
+    each other by id, and a new Point for every cell and unit.
+    """
+    def __init__(self, raw_observation, raw_configuration):
+        observation = Observation(raw_observation)
+        self._step = observation.step
+        self._configuration = Configuration(raw_configuration)
+        self._current_player_id = observation.player
+        self._players = {}
+        self._ships = {}
+        self._shipyards = {}
+        self._cells = {}
+
+        size = self._configuration.size
+        for x in range(size):
+            for y in range(size):
+                position = LegacyPoint(x, y)
+                halite = observation.halite[(size - y - 1) * size + x]
+                self._cells[position] = LegacyCell(position, halite, None, None, self)
+
+        for player_id, (player_halite, player_shipyards, player_ships) in enumerate(observation.players):
+            player = self._players[player_id] = LegacyPlayer(player_id, player_halite, [], [], self)
+            for ship_id, (ship_index, ship_halite) in player_ships.items():
+                y, x = divmod(ship_index, size)
+                ship = LegacyShip(ship_id, LegacyPoint(x, size - y - 1), ship_halite, player_id, self)
+                player._ship_ids.append(ship_id)
+                self._cells[ship._position]._ship_id = ship_id
+                self._ships[ship_id] = ship
+            for shipyard_id, shipyard_index in player_shipyards.items():
+                y, x = divmod(shipyard_index, size)
+                shipyard = LegacyShipyard(shipyard_id, LegacyPoint(x, size - y - 1), player_id, self)
+                player._shipyard_ids.append(shipyard_id)
+                cell = self._cells[shipyard._position]
+                cell._shipyard_id = shipyard_id
+                cell._halite = 0
+                self._shipyards[shipyard_id] = shipyard
+
+
+def bytes_per_board(make_board, count: int = 200) -> float:
+    boards = [make_board()]
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    boards.extend(make_board() for _ in range(count))
+    used = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return used / count
+
+
+if __name__ == '__main__':
+    print(f'{"ships":>6} {"legacy Board()":>15} {"Board()":>12} {"deepcopy":>12} {"lazy Board()":>14}')
+    for num_ships in [10, 40, 100]:
+        observation = random_observation(num_ships=num_ships)
+        board = Board(observation, CONFIGURATION)
+        legacy = bytes_per_board(lambda: LegacyBoard(observation, CONFIGURATION))
+        eager = bytes_per_board(lambda: Board(observation, CONFIGURATION))
+        clone = bytes_per_board(lambda: deepcopy(board))
+        lazy = bytes_per_board(lambda: Board(observation, CONFIGURATION, lazy=True))
+        print(f'{num_ships:>6} {legacy:>13.0f} B {eager:>10.0f} B {clone:>10.0f} B {lazy:>12.0f} B')
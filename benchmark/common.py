@@ -0,0 +1,52 @@
+import random
+import timeit
+from typing import *
+
+from simulator.episode import CONFIGURATION
+
+
+def random_observation(seed: int = 0, size: int = 21, num_ships: int = 40, num_shipyards: int = 8,
+                       num_players: int = 4, step: int = 200) -> Dict[str, Any]:
+    """
+    Build a reproducible midgame observation with units scattered over the board.
+    """
+    rng = random.Random(seed)
+    halite = [rng.choice([0, rng.random() * 500]) for _ in range(size * size)]
+    cells = rng.sample(range(size * size), num_ships + num_shipyards)
+    players = [[rng.randint(0, 5000), {}, {}] for _ in range(num_players)]
+    for uid, index in enumerate(cells[:num_shipyards]):
+        players[uid % num_players][1][f'0-{uid}'] = index
+        halite[index] = 0
+    for uid, index in enumerate(cells[num_shipyards:], num_shipyards):
+        players[uid % num_players][2][f'0-{uid}'] = [index, rng.choice([0, rng.randint(0, 1000)])]
+    return {'halite': halite, 'players': players, 'player': 0, 'step': step}
+
+
+def random_actions(observation: Dict[str, Any], seed: int = 0) -> List[Dict[str, str]]:
+    """
+    Build a reproducible agent response for every player of observation.
+    """
+    rng = random.Random(seed)
+    actions = []
+    for _, shipyards, ships in observation['players']:
+        player_actions = {ship_id: rng.choice(['NORTH', 'EAST', 'SOUTH', 'WEST', None]) for ship_id in ships}
+        player_actions.update({shipyard_id: rng.choice(['SPAWN', None]) for shipyard_id in shipyards})
+        actions.append({unit_id: action for unit_id, action in player_actions.items() if action})
+    return actions
+
+
+def measure(func: Callable[[], Any], number: int = 200, repeat: int = 5) -> float:
+    """
+    Return the best per call time of func in microseconds.
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def report(title: str, rows: List[Tuple[str, float]]) -> None:
+    """
+    Print timings as a table, relative to the first row.
+    """
+    print(title)
+    baseline = rows[0][1]
+    for name, value in rows:
+        print(f'  {name:<40} {value:>12.1f} us {baseline / value:>8.1f}x')
@@ -0,0 +1,33 @@
+"""
+Solve time of the joint move resolver (moves.resolve_moves) versus fleet size.
+
+Usage: python -m benchmark.move_matching
+"""
+import numpy as np
+
+from benchmark.common import *
+from moves import NUM_MOVES, resolve_moves
+
+
+def random_fleet(seed: int, size: int, num_ships: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Ships scattered over the board with random move preferences, a fifth of the moves forbidden.
+    """
+    rng = np.random.default_rng(seed)
+    positions = rng.choice(size * size, num_ships, replace=False)
+    scores = rng.random((num_ships, NUM_MOVES))
+    scores[rng.random((num_ships, NUM_MOVES)) < 0.2] = -np.inf
+    return positions, scores
+
+
+if __name__ == '__main__':
+    for size in [21, 32]:
+        rows = []
+        for num_ships in [10, 25, 50, 100, 200, 400]:
+            if num_ships > size * size // 2:
+                continue
+            positions, scores = random_fleet(0, size, num_ships)
+            rows.append((f'{num_ships} ships', measure(lambda: resolve_moves(positions, scores, size), number=5)))
+        print(f'Joint move resolution, {size}x{size} board')
+        for name, value in rows:
+            print(f'  {name:<40} {value / 1000:>12.2f} ms')
@@ -0,0 +1,84 @@
+"""
+Point operations of the interned, slot based Point versus the original map2/operator based Point.
+
+Usage: python -m benchmark.point
+"""
+import operator
+from typing import *
+
+from benchmark.common import *
+from kaggle_helpers import Point, point_table
+
+
+class LegacyPoint(tuple):
+    """The original kaggle_helpers.Point operators, kept for comparison."""
+    def __new__(cls, x: int, y: int):
+        return super(LegacyPoint, cls).__new__(cls, tuple((x, y)))
+
+    def map(self, f):
+        return LegacyPoint(f(self[0]), f(self[1]))
+
+    def map2(self, other, f):
+        return LegacyPoint(f(self[0], other[0]), f(self[1], other[1]))
+
+    def translate(self, offset, size: int):
+        return (self + offset) % size
+
+    def __add__(self, other):
+        return self.map2(other, operator.add)
+
+    def __eq__(self, other) -> bool:
+        try:
+            return self[0] == other[0] and self[1] == other[1]
+        except (TypeError, IndexError):
+            return False
+
+    def __hash__(self) -> int:
+        return hash((self[0], self[1]))
+
+    def __mod__(self, mod: int):
+        return self.map(lambda x: x % mod)
+
+
+def radar_scan(point_type: Type, size: int = 21, dis: int = 2) -> Callable[[], None]:
+    """
+    The scan loop of SilverBot.radar: wrap every offset of a Manhattan diamond and look the cell up.
+    """
+    cells = {point_type(x, y): None for x in range(size) for y in range(size)}
+    pos = point_type(3, 19)
+
+    if point_type is Point:
+        def scan():
+            for x in range(-dis, dis + 1):
+                for y in range(abs(x) - dis, dis - abs(x) + 1):
+                    cells[pos.translate((x, y), size)]
+    else:
+        def scan():
+            for x in range(-dis, dis + 1):
+                for y in range(abs(x) - dis, dis - abs(x) + 1):
+                    cells[(pos + (x, y)) % size]
+    return scan
+
+
+if __name__ == '__main__':
+    size = 21
+    legacy, point = LegacyPoint(20, 3), Point(20, 3)
+    table = point_table(size)
+    report('Point translate with wraparound', [
+        ('LegacyPoint (p + offset) % size', measure(lambda: (legacy + (1, 0)) % size, number=20000)),
+        ('Point.translate (interned lookup)', measure(lambda: point.translate((1, 0), size), number=20000)),
+        ('PointTable.translate', measure(lambda: table.translate(point, (1, 0)), number=20000)),
+    ])
+    report('Point equality', [
+        ('LegacyPoint ==', measure(lambda: legacy == LegacyPoint(20, 3), number=20000)),
+        ('Point ==', measure(lambda: point == Point(20, 3), number=20000)),
+    ])
+    report('Point as dict key', [
+        ('LegacyPoint hash', measure(lambda: hash(legacy), number=20000)),
+        ('Point hash', measure(lambda: hash(point), number=20000)),
+    ])
+    for dis in [2, 6]:
+        report(f'Radar diamond scan, dis={dis}', [
+            ('LegacyPoint', measure(radar_scan(LegacyPoint, size, dis), number=2000)),
+            ('Point', measure(radar_scan(Point, size, dis), number=2000)),
+        ])
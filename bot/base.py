@@ -5,7 +5,7 @@ class Bot:
     def __init__(self, obs, config):
         self.obs = obs
         self.config = config
-        self.board = Board(obs, config)
+        self.board = Board(obs, config, lazy=True)
         self.size = config.size
         self.me = self.board.current_player
 
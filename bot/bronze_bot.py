@@ -5,6 +5,8 @@ import numpy as np
 from bot.base import Bot
 from helper import *
 from kaggle_helpers import *
+from moves import *
+from radar import *
 
 
 class BronzeBot(Bot):
@@ -13,7 +15,7 @@ class BronzeBot(Bot):
         super().__init__(obs, config)
         self.obs = obs
         self.config = config
-        self.board = Board(obs, config)
+        self.board = Board(obs, config, lazy=True)
         self.size = config.size
         self.me = self.board.current_player
 
@@ -29,11 +31,42 @@ class BronzeBot(Bot):
         self.halite_map = None
         self.unit_map = None
 
-        self.unit_radar = {}
         self.radar_params = {}
         self.ship_state = {}
-        self.ship_next_pos = set()
         self.ship_wait_log = {}
+        self.reset_turn()
+
+    def reset_turn(self):
+        """
+        Initialize the state that only holds for the current turn (self.obs), see update.
+        """
+        self.unit_radar = {}
+        self.ship_next_pos = set()
+        self.board_radar = BoardRadar(self.obs, self.config)
+        self.radar_cache = RadarCache()
+        self.move_evaluator = None
+        # Same positions as self.ship_next_pos, indexed like observation.halite
+        self.next_pos_grid = np.zeros(self.size ** 2, dtype=bool)
+
+    def update(self, obs):
+        """
+        Feed the observation of the next turn of the same game, so one bot can play a whole game.
+        The board is updated in place, the turn state is rebuilt and the ship states of lost ships are dropped.
+        A ship still in 'CONVERT' failed to convert (not enough halite), ship_command has no order for that state so
+        the ship goes back to EXPLORE.
+        """
+        self.obs = obs
+        self.board.update(obs)
+        self.me = self.board.current_player
+        for ship_id in list(self.ship_state):
+            if ship_id not in self.board.ships:
+                del self.ship_state[ship_id]
+            elif self.ship_state[ship_id] == 'CONVERT':
+                self.ship_state[ship_id] = 'EXPLORE'
+        for ship_id in list(self.ship_wait_log):
+            if ship_id not in self.board.ships:
+                del self.ship_wait_log[ship_id]
+        self.reset_turn()
 
     # TODO: legacy function
     def get_map(self):
@@ -57,52 +90,56 @@ class BronzeBot(Bot):
                 for index, _ in ships.values():
                     self.unit_map[index_to_position(index, self.size)] += -1
 
-    # TODO: refactor for efficiency
     def radar(self, unit: Ship, dis: int = 2):
+        """
+        Radar for ship & shipyard, stored in self.unit_radar[unit.id].
+        The radar summary is looked up from self.board_radar, the per-cell detail is only scanned when a strategy
+        reads it, see scan.
+        Args:
+            unit: Ship or shipyard
+            dis: Manhattan Distance for radar scanning
+        """
+        summary = self.board_radar.summary(unit.position.to_index(self.size), dis)
+        self.unit_radar[unit.id] = UnitRadar(lambda: self.scan(unit, dis), summary)
+
+    def scan(self, unit: Ship, dis: int = 2):
         """
         Radar Scanning for ship & shipyard.
         Gather information of [ally, enemy, halite, free halite].
         Note: free halite here is estimated gain given number of turns in free area.
+        Scans are cached for the turn in self.radar_cache, see scan_cell for the per-cell part.
         Args:
             unit: ship or shipyard
             dis: Manhattan Distance for radar scanning
         """
-        pos = unit.position
+        return self.radar_cache.get(unit.position, dis, lambda: self._scan(unit, dis))
+
+    def _scan(self, unit: Ship, dis: int):
         halite, free_halite = {}, {}
         ally_ship, ally_shipyard = [], []
         enemy_ship, enemy_shipyard = [], []
+        gain = self.board_radar.gain(tuple(range(2, dis + 2)))
+
+        cells = self.radar_cache.cells(unit.position, dis, lambda offset: self.scan_cell(unit, offset))
+        for scan_pos, scan_index, scan_dis, cell_halite, ship_kind, shipyard_kind in cells:
+            halite[scan_pos] = cell_halite
+
+            if ship_kind or shipyard_kind:
+                if ship_kind == 'ally':
+                    ally_ship.append(scan_pos)
+                elif ship_kind == 'enemy':
+                    enemy_ship.append(scan_pos)
+                if shipyard_kind == 'ally':
+                    ally_shipyard.append(scan_pos)
+                elif shipyard_kind == 'enemy':
+                    enemy_shipyard.append(scan_pos)
+            else:
+                # To be determined
+                # Estimate halite gain in scan_pos with t [2, dis + 1] turns.
+                # The closer the cell, the more turns ship has to collect halite.
+                free_halite[scan_pos] = list(gain[:, scan_dis, scan_index])
 
-        # Start scanning
-        for x in range(-dis, dis + 1):
-            for y in range(abs(x) - dis, dis - abs(x) + 1):
-
-                scan_pos = unify_pos(pos + (x, y), self.size)
-                cell = self.board[scan_pos]
-                halite[scan_pos] = cell.halite
-
-                if scan_pos != unit.position and (cell.ship or cell.shipyard):
-                    if cell.ship:
-                        if cell.ship.player == self.me:
-                            ally_ship.append(cell.position)
-                        else:
-                            enemy_ship.append(cell.position)
-                    if cell.shipyard:
-                        if cell.shipyard.player == self.me:
-                            ally_shipyard.append(cell.position)
-                        else:
-                            enemy_shipyard.append(cell.position)
-                else:
-                    # To be determined
-                    # Estimate halite gain in scan_pos with t [2, dis + 1] turns.
-                    # The closer the cell, the more turns ship has to collect halite.
-                    free_halite[scan_pos] = []
-                    for t in range(2, dis + 2):
-                        free_halite[scan_pos].append(
-                            estimate_gain(cell.halite, cal_dis(pos, scan_pos), t)
-                        )
-
-        self.unit_radar[unit.id] = {
-            'dis': dis,
+        return {
             'halite': halite,
             'free_halite': free_halite,
             'ally_ship': ally_ship,
@@ -111,6 +148,26 @@ class BronzeBot(Bot):
             'enemy_shipyard': enemy_shipyard,
         }
 
+    def scan_cell(self, unit: Ship, offset: tuple):
+        """
+        Scan the cell at offset from unit, the radius independent part of the radar.
+        Returns: (position, index, distance, halite, ship_kind, shipyard_kind), the kinds are 'ally', 'enemy' or None
+            for no unit. Units on the center cell are left out.
+        """
+        pos = unit.position
+        scan_pos = pos.translate(offset, self.size)
+        cell = self.board[scan_pos]
+        scan_index = scan_pos.to_index(self.size)
+        scan_dis = int(distances_from(pos.to_index(self.size), self.size)[scan_index])
+        ship_kind, shipyard_kind = None, None
+
+        if scan_pos != pos:
+            if cell.ship:
+                ship_kind = 'ally' if cell.ship.player == self.me else 'enemy'
+            if cell.shipyard:
+                shipyard_kind = 'ally' if cell.shipyard.player == self.me else 'enemy'
+        return scan_pos, scan_index, scan_dis, cell.halite, ship_kind, shipyard_kind
+
     def navigate(self, ship: Ship, des: Point):
         """
         Navigate ship to destination, give out optimal action for current turn.
@@ -169,71 +226,39 @@ class BronzeBot(Bot):
             ship: Ship
             move: Tuple
 
-        Returns: True if next_pos is accessible.
-        """
-        next_pos = unify_pos(ship.position + move, self.size)
-        next_cell = self.board[next_pos]
-
-        # Basic condition
-        # Check next_pos current occupation condition
-        cell_condition_1 = next_cell.ship is not None
-        cell_condition_2 = next_cell.shipyard is not None
-
-        # DETOUR
-        detour_case_1 = cell_condition_1 and next_cell.ship.player != self.me and next_cell.ship.halite <= ship.halite
-        detour_case_2 = cell_condition_2 and next_cell.shipyard.player != self.me
-        detour_condition = detour_case_1 or detour_case_2
-
-        # MOVE
-        # Check if there's any nearby enemy ship for next_pos
-        safe_condition = self.find_close_enemy(ship, dis=1, pos=next_pos) == []
-        # Check if next_pos is accessible next round
-        next_condition = next_cell.position not in self.ship_next_pos
-        # Move cases
-        move_case_1 = not cell_condition_1 and not cell_condition_2
-        move_case_2 = cell_condition_1 and not cell_condition_2 and next_cell.ship.player != self.me and next_cell.ship.halite > ship.halite
-        move_case_3 = not cell_condition_1 and cell_condition_2 and next_cell.shipyard.player == self.me
-        move_case_4 = cell_condition_1 and next_cell.ship.next_action is not None
-        move_cases = (move_case_1 or move_case_2 or move_case_3 or move_case_4)
-        move_condition = move_cases and safe_condition and next_condition
-
-        if detour_condition:
-            return 'DETOUR'
-        elif move_condition:
-            return 'MOVE'
-        else:
-            return 'WAIT'
+        Returns: 'MOVE' if next_pos is accessible, 'DETOUR' if it's dangerous, else 'WAIT'.
+        See MoveEvaluator for the conditions.
+        """
+        if self.move_evaluator is None:
+            self.move_evaluator = MoveEvaluator(self.board, self.board_radar, self.me.ships)
+        return self.move_evaluator.case(ship, move, self.next_pos_grid)
 
     def course_reversal(self, ship: Ship):
         """
         Command function for DEPOSIT ship navigation.
         """
         if self.me.shipyards:
-            nearest_shipyard = min(self.me.shipyards, key=lambda x: cal_dis(ship.position, x.position))
+            shipyards = self.me.shipyards
         else:
             shipyards = [ship for ship in self.me.ships if self.ship_state.get(ship.id) == 'CONVERT']
-            nearest_shipyard = min(shipyards, key=lambda x: cal_dis(ship.position, x.position))
+        dis_from = distances_from(ship.position.to_index(self.size), self.size)
+        shipyard_dis = dis_from[[shipyard.position.to_index(self.size) for shipyard in shipyards]]
+        nearest_shipyard = shipyards[int(np.argmin(shipyard_dis))]
         self.navigate(ship, nearest_shipyard.position)
 
-    def find_close_enemy(self, ship: Ship, dis: int = 1, pos: Point = None) -> list:
+    def is_safe(self, ship: Ship, dis: int = 1, pos: Point = None) -> bool:
         """
-        Find dangerous enemy ship in given distance.
+        Check there's no dangerous enemy ship in given distance, i.e. no enemy ship within dis carries as little
+        halite as ship or less.
+        Reads the turn's threat map, enemies are not limited to the ship radar.
         Args:
             ship: Ship
             dis: Int, Default = 1. The distance of security_check.
             pos: Point, Default = None. If is given, then take pos as the security check center.
-
-        Returns: List of close enemy, if clear then return an empty list.
         """
-        radar = self.unit_radar[ship.id]
-        close_enemy = []
         if not pos:
             pos = ship.position
-        for enemy_pos in radar['enemy_ship']:
-            enemy_ship = self.board[enemy_pos]
-            if 0 < cal_dis(pos, enemy_pos) <= dis and ship.halite >= enemy_ship.halite:
-                close_enemy.append(enemy_pos)
-        return close_enemy
+        return ship.halite < self.board_radar.threat(dis)[pos.to_index(self.size)]
 
     def explore_command(self, ship: Ship, radar: dict, deposit_halite: int = 500, security_dis: int = 1):
         """
@@ -294,7 +319,7 @@ class BronzeBot(Bot):
                 if ship.halite >= deposit_halite:
                     self.course_reversal(ship)
                 else:
-                    if not self.find_close_enemy(ship, security_dis):
+                    if self.is_safe(ship, security_dis):
                         self.ship_state[ship.id] = 'EXPLORE'
                         self.ship_command(ship, radar_dis, deposit_halite, security_dis)
                     else:
@@ -317,7 +342,7 @@ class BronzeBot(Bot):
                 self.ship_state[ship.id] = 'DEPOSIT'
                 self.ship_command(ship, radar_dis, deposit_halite, security_dis)
             else:
-                if not self.find_close_enemy(ship, security_dis):
+                if self.is_safe(ship, security_dis):
                     self.explore_command(ship, radar, deposit_halite, security_dis)
                 else:
                     self.ship_state[ship.id] = 'DEPOSIT'
@@ -343,7 +368,7 @@ class BronzeBot(Bot):
                 shipyard.next_action = ShipyardAction.SPAWN
                 new_ship += 1
                 # Add new ship position into self.ship_next_pos
-                self.ship_next_pos.add(shipyard.position)
+                self.reserve(shipyard.position)
 
     def convert_command(self):
         """
@@ -358,23 +383,30 @@ class BronzeBot(Bot):
             convert_ship.next_action = ShipAction.CONVERT
             self.ship_state[convert_ship.id] = 'CONVERT'
 
+    def reserve(self, pos: Point):
+        """
+        Add pos into self.ship_next_pos, the positions taken next turn.
+        """
+        self.ship_next_pos.add(pos)
+        self.next_pos_grid[pos.to_index(self.size)] = True
+
     def update_ship_next_pos(self, ship):
         """
         Update self.ship_next_pos by ship.next_action for next turn.
         """
         pos = ship.position
         if ship.next_action is None:
-            self.ship_next_pos.add(pos)
+            self.reserve(pos)
         elif ship.next_action != ShipAction.CONVERT:
             if ship.next_action == ShipAction.NORTH:
-                next_pos = unify_pos(pos + (0, 1), self.size)
+                next_pos = pos.translate((0, 1), self.size)
             elif ship.next_action == ShipAction.SOUTH:
-                next_pos = unify_pos(pos + (0, -1), self.size)
+                next_pos = pos.translate((0, -1), self.size)
             elif ship.next_action == ShipAction.WEST:
-                next_pos = unify_pos(pos + (-1, 0), self.size)
+                next_pos = pos.translate((-1, 0), self.size)
             else:
-                next_pos = unify_pos(pos + (1, 0), self.size)
-            self.ship_next_pos.add(next_pos)
+                next_pos = pos.translate((1, 0), self.size)
+            self.reserve(next_pos)
 
     def play(self, radar_dis=2, deposit_halite=500, security_dis=1, max_ship=5):
         """
@@ -0,0 +1,49 @@
+from typing import *
+
+
+class AgentHost:
+    """
+    Long-lived agent that keeps one bot per game and player, instead of building a new bot every turn.
+    The bot is fed each new observation with bot.update(obs), so ship states and derived caches survive across
+    turns. A new bot is built when a new episode starts, i.e. the step doesn't move forward.
+
+    Example:
+        host = AgentHost(SilverBot, radar_dis=2, deposit_halite=300, max_ship=20)
+
+        def agent(obs, config):
+            return host(obs, config)
+    """
+
+    def __init__(self, bot_class: type, **play_kwargs) -> None:
+        """
+        Args:
+            bot_class: Bot class built as bot_class(obs, config), with update(obs) and play(**play_kwargs).
+            play_kwargs: Parameters of bot.play.
+        """
+        self.bot_class = bot_class
+        self.play_kwargs = play_kwargs
+        # Local runs may use one agent for several players, so bots are kept per player.
+        self.bots: Dict[int, Any] = {}
+        self.last_step: Dict[int, int] = {}
+
+    def is_new_episode(self, obs) -> bool:
+        """Check if obs starts a new game for its player."""
+        last_step = self.last_step.get(obs.player)
+        return last_step is None or obs.step <= last_step
+
+    def reset(self) -> None:
+        """Drop all bots, the next observation starts a new game."""
+        self.bots.clear()
+        self.last_step.clear()
+
+    def get_bot(self, obs, config):
+        """Returns the bot of obs.player, updated to obs or built for a new episode."""
+        if self.is_new_episode(obs):
+            self.bots[obs.player] = self.bot_class(obs, config)
+        else:
+            self.bots[obs.player].update(obs)
+        self.last_step[obs.player] = obs.step
+        return self.bots[obs.player]
+
+    def __call__(self, obs, config) -> Dict[str, str]:
+        return self.get_bot(obs, config).play(**self.play_kwargs)
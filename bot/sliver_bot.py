@@ -7,6 +7,10 @@ import numpy as np
 from bot.base import Bot
 from helper import *
 from kaggle_helpers import *
+from moves import *
+from radar import *
+from routing import *
+from targets import *
 
 
 class SilverBot:
@@ -14,7 +18,7 @@ class SilverBot:
     def __init__(self, obs, config):
         self.obs = obs
         self.config = config
-        self.board = Board(obs, config)
+        self.board = Board(obs, config, lazy=True)
         self.size = config.size
         self.me = self.board.current_player
 
@@ -31,11 +35,46 @@ class SilverBot:
         self.halite_map = None
         self.unit_map = None
 
-        self.unit_radar = {}
         self.radar_params = {}
         self.ship_state = {}
-        self.ship_next_pos = set()
         self.ship_wait_log = {}
+        # Extra cost of entering a cell next to an enemy ship on deposit routes, set by play.
+        self.hazard_cost = 0
+        self.reset_turn()
+
+    def reset_turn(self):
+        """
+        Initialize the state that only holds for the current turn (self.obs), see update.
+        """
+        self.unit_radar = {}
+        self.ship_next_pos = set()
+        self.board_radar = BoardRadar(self.obs, self.config)
+        self.radar_cache = RadarCache()
+        self.move_evaluator = None
+        self.ship_targets = {}
+        self.shipyard_routes = {}
+        # Same positions as self.ship_next_pos, indexed like observation.halite
+        self.next_pos_grid = np.zeros(self.size ** 2, dtype=bool)
+
+    def update(self, obs):
+        """
+        Feed the observation of the next turn of the same game, so one bot can play a whole game.
+        The board is updated in place, the turn state is rebuilt and the ship states of lost ships are dropped.
+        A ship still in 'CONVERT' failed to convert (not enough halite), ship_command has no order for that state so
+        the ship goes back to EXPLORE.
+        """
+        self.obs = obs
+        self.board.update(obs)
+        self.me = self.board.current_player
+        for ship_id in list(self.ship_state):
+            if ship_id not in self.board.ships:
+                del self.ship_state[ship_id]
+            elif self.ship_state[ship_id] == 'CONVERT':
+                self.ship_state[ship_id] = 'EXPLORE'
+        for ship_id in list(self.ship_wait_log):
+            if ship_id not in self.board.ships:
+                del self.ship_wait_log[ship_id]
+        self.reset_turn()
 
     def get_map(self):
         """
@@ -60,53 +99,59 @@ class SilverBot:
         #         for index, _ in ships.values():
         #             self.unit_map[index_to_position(index, self.size)] += -1
 
-    # TODO: refactor for efficiency
     def radar(self, unit: Union[Ship, Shipyard], dis: int = 2):
+        """
+        Radar for ship & shipyard, stored in self.unit_radar[unit.id].
+        The radar summary is looked up from self.board_radar, the per-cell detail is only scanned when a strategy
+        reads it, see scan.
+        Args:
+            unit: Ship or shipyard
+            dis: Manhattan Distance for radar scanning
+        """
+        summary = self.board_radar.summary(unit.position.to_index(self.size), dis)
+        self.unit_radar[unit.id] = UnitRadar(lambda: self.scan(unit, dis), summary)
+
+    def scan(self, unit: Union[Ship, Shipyard], dis: int = 2):
         """
         Radar Scanning for ship & shipyard.
         Gather information of [ally, enemy, halite, free halite].
         Note: free halite is available halite here, which is estimated gain given number of turns in free area.
+        Scans are cached for the turn in self.radar_cache, see scan_cell for the per-cell part.
         Args:
             unit: Ship or shipyard
             dis: Manhattan Distance for radar scanning
         """
-        pos = unit.position
+        return self.radar_cache.get(unit.position, dis, lambda: self._scan(unit, dis))
+
+    def _scan(self, unit: Union[Ship, Shipyard], dis: int):
         halite, free_halite = {}, {}
         ally_ship, ally_shipyard = [], []
         enemy_ship, enemy_shipyard = [], []
+        # Estimated halite gain in (dis + 1) turns, gain[d, index] for a ship d moves away from the cell.
+        gain = self.board_radar.gain((dis + 1,))[0]
+
+        cells = self.radar_cache.cells(unit.position, dis, lambda offset: self.scan_cell(unit, offset))
+        for scan_pos, scan_index, scan_dis, cell_halite, kind, enemy_halite in cells:
+            halite[scan_pos] = cell_halite
+            if kind == 'center':
+                # scan_pos == pos, add ship current position into free_halite.
+                free_halite[scan_pos] = gain[0, scan_index]
+            elif kind == 'enemy_ship':
+                enemy_ship.append(scan_pos)
+                # Enemy ship with rich halite is considered as free_halite.
+                if enemy_halite is not None:
+                    free_halite[scan_pos] = gain[0, scan_index] + enemy_halite
+            elif kind == 'empty':
+                # Cell is empty, calculate estimated halite gain for (dis + 1) turns.
+                free_halite[scan_pos] = gain[scan_dis, scan_index]
+            elif kind == 'ally_ship':
+                ally_ship.append(scan_pos)
+            elif kind == 'ally_shipyard':
+                ally_shipyard.append(scan_pos)
+            else:
+                enemy_shipyard.append(scan_pos)
 
-        # Start scanning
-        for x in range(-dis, dis + 1):
-            for y in range(abs(x) - dis, dis - abs(x) + 1):
-
-                scan_pos = unify_pos(pos + (x, y), self.size)
-                scan_cell = self.board[scan_pos]
-                halite[scan_pos] = scan_cell.halite
-
-                if scan_cell.ship:
-                    if scan_cell.ship.player == self.me:
-                        if scan_pos != pos:
-                            ally_ship.append(scan_cell.position)
-                        else:
-                            # scan_pos == pos, add ship current position into free_halite.
-                            free_halite[scan_pos] = estimate_gain(scan_cell.halite, dis=0, t=dis + 1)
-                    else:
-                        enemy_ship.append(scan_cell.position)
-                        # Enemy ship with rich halite is considered as free_halite.
-                        if isinstance(unit, Ship) and scan_cell.ship.halite > unit.halite:
-                            free_halite[scan_pos] = estimate_gain(
-                                scan_cell.halite, dis=0, t=dis + 1) + scan_cell.ship.halite
-                elif scan_cell.shipyard:
-                    if scan_cell.shipyard.player == self.me:
-                        ally_shipyard.append(scan_cell.position)
-                    else:
-                        enemy_shipyard.append(scan_cell.position)
-                else:
-                    # Cell is empty, calculate estimated halite gain for (dis + 1) turns.
-                    free_halite[scan_pos] = estimate_gain(scan_cell.halite, dis=cal_dis(pos, scan_pos), t=dis + 1)
-
-        self.unit_radar[unit.id] = {
-            'dis': dis,
+        return {
             'halite': halite,
             # Note: Different with BronzeBot, the value is float instead of list.
             'free_halite': free_halite,
@@ -116,19 +161,48 @@ class SilverBot:
             'enemy_shipyard': enemy_shipyard,
         }
 
-    def navigate(self, ship: Ship, des: Point, detour: bool = True):
+    def scan_cell(self, unit: Union[Ship, Shipyard], offset: tuple):
+        """
+        Scan the cell at offset from unit, the radius independent part of the radar.
+        Returns: (position, index, distance, halite, kind, enemy_halite), kind is one of 'center', 'ally_ship',
+            'enemy_ship', 'ally_shipyard', 'enemy_shipyard' or 'empty', enemy_halite is the halite of an enemy ship
+            richer than the ship unit, else None.
+        """
+        pos = unit.position
+        scan_pos = pos.translate(offset, self.size)
+        scan_cell = self.board[scan_pos]
+        scan_index = scan_pos.to_index(self.size)
+        scan_dis = int(distances_from(pos.to_index(self.size), self.size)[scan_index])
+        enemy_halite = None
+
+        if scan_cell.ship:
+            if scan_cell.ship.player == self.me:
+                kind = 'ally_ship' if scan_pos != pos else 'center'
+            else:
+                kind = 'enemy_ship'
+                if isinstance(unit, Ship) and scan_cell.ship.halite > unit.halite:
+                    enemy_halite = scan_cell.ship.halite
+        elif scan_cell.shipyard:
+            kind = 'ally_shipyard' if scan_cell.shipyard.player == self.me else 'enemy_shipyard'
+        else:
+            kind = 'empty'
+        return scan_pos, scan_index, scan_dis, scan_cell.halite, kind, enemy_halite
+
+    def navigate(self, ship: Ship, des: Point, detour: bool = True, directions: list = None):
         """
         Navigate ship to destination, give out optimal action for current turn.
         Args:
             ship: Ship.
             des: destination position.
             detour: bool, if True ship will make detour or wait.
+            directions: list, Default = None. If is given, the moves to try instead of the shortest path moves.
         """
-        # There are actually 4 different paths, find out the shortest one.
-        move_x, move_y = unify_pos(des, self.size) - ship.position
-        move_x, move_y = get_shorter_move(move_x, self.size), get_shorter_move(move_y, self.size)
-        directions = [(np.sign(move_x), 0), (0, np.sign(move_y))]
-        directions = [x for x in directions if x != (0, 0)]
+        if directions is None:
+            # There are actually 4 different paths, find out the shortest one.
+            move_x, move_y = unify_pos(des, self.size) - ship.position
+            move_x, move_y = get_shorter_move(move_x, self.size), get_shorter_move(move_y, self.size)
+            directions = [(np.sign(move_x), 0), (0, np.sign(move_y))]
+            directions = [x for x in directions if x != (0, 0)]
 
         if detour:
             candidate_move = []
@@ -189,71 +263,53 @@ class SilverBot:
             ship: Ship
             move: Tuple
 
-        Returns: True if next_pos is accessible.
-        """
-        next_pos = unify_pos(ship.position + move, self.size)
-        next_cell = self.board[next_pos]
-
-        # Basic condition
-        # Check next_pos current occupation condition
-        cell_condition_1 = next_cell.ship is not None
-        cell_condition_2 = next_cell.shipyard is not None
-
-        # DETOUR
-        detour_case_1 = cell_condition_1 and next_cell.ship.player != self.me and next_cell.ship.halite <= ship.halite
-        detour_case_2 = cell_condition_2 and next_cell.shipyard.player != self.me
-        detour_condition = detour_case_1 or detour_case_2
-
-        # MOVE
-        # Check if there's any nearby enemy ship for next_pos
-        safe_condition = self.find_close_enemy(ship, dis=1, pos=next_pos) == []
-        # Check if next_pos is accessible next round
-        next_condition = next_cell.position not in self.ship_next_pos
-        # Move cases
-        move_case_1 = not cell_condition_1 and not cell_condition_2
-        move_case_2 = cell_condition_1 and not cell_condition_2 and next_cell.ship.player != self.me and next_cell.ship.halite > ship.halite
-        move_case_3 = not cell_condition_1 and cell_condition_2 and next_cell.shipyard.player == self.me
-        move_case_4 = cell_condition_1 and next_cell.ship.next_action is not None
-        move_cases = (move_case_1 or move_case_2 or move_case_3 or move_case_4)
-        move_condition = move_cases and safe_condition and next_condition
-
-        if detour_condition:
-            return 'DETOUR'
-        elif move_condition:
-            return 'MOVE'
-        else:
-            return 'WAIT'
+        Returns: 'MOVE' if next_pos is accessible, 'DETOUR' if it's dangerous, else 'WAIT'.
+        See MoveEvaluator for the conditions.
+        """
+        if self.move_evaluator is None:
+            self.move_evaluator = MoveEvaluator(self.board, self.board_radar, self.me.ships)
+        return self.move_evaluator.case(ship, move, self.next_pos_grid)
 
     def course_reversal(self, ship: Ship, detour: bool = True):
         """
         Command function for DEPOSIT ship navigation.
+        Ship follows the cheapest route to the nearest shipyard, see get_shipyard_routes.
         """
         if self.me.shipyards:
-            nearest_shipyard = min(self.me.shipyards, key=lambda x: cal_dis(ship.position, x.position))
+            shipyards = self.me.shipyards
         else:
             shipyards = [ship for ship in self.me.ships if self.ship_state.get(ship.id) == 'CONVERT']
-            nearest_shipyard = min(shipyards, key=lambda x: cal_dis(ship.position, x.position))
-        self.navigate(ship, nearest_shipyard.position, detour)
+        routes = self.get_shipyard_routes(shipyards)
+        index = ship.position.to_index(self.size)
+        nearest = routes.nearest(index)
+        self.navigate(ship, shipyards[nearest].position, detour, routes.first_moves(nearest, index))
 
-    def find_close_enemy(self, ship: Ship, dis: int = 1, pos: Point = None) -> list:
+    def get_shipyard_routes(self, shipyards: list):
+        """
+        Routes to given shipyards (or converting ships), built once per turn.
+        With self.hazard_cost, cells next to an enemy ship cost that much more to enter.
+        """
+        sources = tuple(shipyard.position.to_index(self.size) for shipyard in shipyards)
+        if sources not in self.shipyard_routes:
+            hazard = None
+            if self.hazard_cost:
+                hazard = np.where(np.isfinite(self.board_radar.threat(1)), float(self.hazard_cost), 0.0)
+            self.shipyard_routes[sources] = ShipyardRoutes(sources, self.size, hazard)
+        return self.shipyard_routes[sources]
+
+    def is_safe(self, ship: Ship, dis: int = 1, pos: Point = None) -> bool:
         """
-        Find dangerous enemy ship in given distance.
+        Check there's no dangerous enemy ship in given distance, i.e. no enemy ship within dis carries as little
+        halite as ship or less.
+        Reads the turn's threat map, enemies are not limited to the ship radar.
         Args:
             ship: Ship
             dis: Int, Default = 1. The distance of security_check.
             pos: Point, Default = None. If is given, then take pos as the security check center.
-
-        Returns: List of close enemy, if clear then return an empty list.
         """
-        radar = self.unit_radar[ship.id]
-        close_enemy = []
         if not pos:
             pos = ship.position
-        for enemy_pos in radar['enemy_ship']:
-            enemy_ship = self.board[enemy_pos]
-            if 0 < cal_dis(pos, enemy_pos) <= dis and ship.halite >= enemy_ship.halite:
-                close_enemy.append(enemy_pos)
-        return close_enemy
+        return ship.halite < self.board_radar.threat(dis)[pos.to_index(self.size)]
 
     def explore_command(self, ship: Ship, radar: dict, deposit_halite: int = 500,
                         security_dis: int = 1, convert_sum: float = 1000):
@@ -266,12 +322,20 @@ class SilverBot:
         """
 
         # Sum up radar area halite excluding ship current cell.
-        halite_sum = np.sum(list(radar['halite'].values())) - ship.cell.halite
+        halite_sum = radar['halite_sum'] - ship.cell.halite
         # Check if this area is rich and hasn't been developed (there's no shipyard in 4 distance area).
+        dis_from = distances_from(ship.position.to_index(self.size), self.size)
         if halite_sum >= convert_sum and all(
-                [cal_dis(ship.position, shipyard.position) > 4 for shipyard in self.me.shipyards]):
+                [dis_from[shipyard.position.to_index(self.size)] > 4 for shipyard in self.me.shipyards]):
             ship.next_action = ShipAction.CONVERT
             self.ship_state[ship.id] = 'CONVERT'
+        elif ship.id in self.ship_targets:
+            # Follow the fleet target of this turn, see allocate_fleet_targets.
+            target = self.ship_targets[ship.id]
+            if target == ship.position:
+                self.ship_state[ship.id] = 'COLLECT'
+            else:
+                self.navigate(ship, target)
         else:
             max_free_halite = np.max(list(radar['free_halite'].values()))
             # Check if ship has arrived max free halite position
@@ -327,7 +391,7 @@ class SilverBot:
                     self.course_reversal(ship)
                 else:
                     # Clear, ship back to EXPLORE.
-                    if not self.find_close_enemy(ship, security_dis):
+                    if self.is_safe(ship, security_dis):
                         self.ship_state[ship.id] = 'EXPLORE'
                         self.ship_command(ship, radar_dis, deposit_halite, security_dis)
                     else:
@@ -350,7 +414,7 @@ class SilverBot:
                 self.ship_state[ship.id] = 'DEPOSIT'
                 self.ship_command(ship, radar_dis, deposit_halite, security_dis)
             else:
-                if not self.find_close_enemy(ship, security_dis):
+                if self.is_safe(ship, security_dis):
                     self.explore_command(ship, radar, deposit_halite, security_dis, convert_sum)
                 else:
                     self.ship_state[ship.id] = 'DEPOSIT'
@@ -368,14 +432,9 @@ class SilverBot:
         """
         if self.me.halite > self.config.spawnCost:
             # Gather all empty shipyard and sort by radar area's free_halite sum value.
-            empty_shipyard = []
-            for shipyard in self.me.shipyards:
-                if not shipyard.cell.ship:
-                    empty_shipyard.append(shipyard)
-                    self.radar(shipyard, dis=2)
-            empty_shipyard.sort(key=lambda x: np.sum(
-                list(self.unit_radar[x.id]['free_halite'].values())
-            ))
+            empty_shipyard = [shipyard for shipyard in self.me.shipyards if not shipyard.cell.ship]
+            free_gain_sum = self.board_radar.free_gain_sum(dis=2)
+            empty_shipyard.sort(key=lambda x: free_gain_sum[x.position.to_index(self.size)])
 
             # Dynamically control the max_num_ship.
             # Strategy_1: in [0, 100) turn, spawn ships by given max_num_ship.
@@ -414,7 +473,7 @@ class SilverBot:
                 shipyard.next_action = ShipyardAction.SPAWN
                 new_ship += 1
                 # Add new ship position into self.ship_next_pos
-                self.ship_next_pos.add(shipyard.position)
+                self.reserve(shipyard.position)
 
     def convert_base_command(self):
         """
@@ -430,13 +489,20 @@ class SilverBot:
             convert_ship.next_action = ShipAction.CONVERT
             self.ship_state[convert_ship.id] = 'CONVERT'
 
+    def reserve(self, pos: Point):
+        """
+        Add pos into self.ship_next_pos, the positions taken next turn.
+        """
+        self.ship_next_pos.add(pos)
+        self.next_pos_grid[pos.to_index(self.size)] = True
+
     def update_ship_next_pos(self, ship):
         """
         Update self.ship_next_pos by ship.next_action for next turn.
         """
         pos = ship.position
         if ship.next_action is None:
-            self.ship_next_pos.add(pos)
+            self.reserve(pos)
         elif ship.next_action != ShipAction.CONVERT:
             if ship.next_action == ShipAction.NORTH:
                 next_pos = pos + (0, 1)
@@ -446,7 +512,7 @@ class SilverBot:
                 next_pos = pos + (-1, 0)
             else:
                 next_pos = pos + (1, 0)
-            self.ship_next_pos.add(unify_pos(next_pos, self.size))
+            self.reserve(unify_pos(next_pos, self.size))
 
     def final_deposit(self):
         """
@@ -466,13 +532,60 @@ class SilverBot:
                     if ship.halite >= self.config.convertCost:
                         ship.next_action = ShipAction.CONVERT
 
-    def play(self, radar_dis=2, deposit_halite=500, security_dis=1, convert_sum: float = 1000, max_ship=5):
+    def allocate_fleet_targets(self, radar_dis: int = 2, deposit_halite: int = 500):
+        """
+        Assign distinct EXPLORE destinations to all ships at once, instead of each ship picking the max free halite
+        of its own radar, so ships sharing a rich area don't converge on the same cell.
+        Targets are valued over the radar's (radar_dis + 1) turns, and a COLLECT ship keeps its cell while no cell is
+        worth more to it (see allocate_targets), the same rule as the radar strategy.
+        Ships holding deposit_halite or more are left out, ships without a valuable target keep the radar strategy.
+        """
+        ships = [ship for ship in self.me.ships if ship.halite < deposit_halite]
+        positions = np.array([ship.position.to_index(self.size) for ship in ships], dtype=np.int64)
+        collecting = np.array([self.ship_state.get(ship.id) == 'COLLECT' for ship in ships], dtype=bool)
+        targets = allocate_targets(positions, self.board_radar, turns=radar_dis + 1, collecting=collecting)
+        for ship, target in zip(ships, targets):
+            if target >= 0:
+                self.ship_targets[ship.id] = Point.from_index(int(target), self.size)
+
+    def resolve_fleet_moves(self):
+        """
+        Re-assign the moves of all ships jointly, so that no two ships take the same next position.
+        Each ship prefers its own order, then staying, then any other move that case_analysis finds safe ('MOVE').
+        Spawning shipyards are blocked and CONVERT ships are left out. A ship without any safe free option takes a free
+        cell anyway (see resolve_moves), only a ship whose 5 cells are all taken keeps its order.
+        """
+        ships = [ship for ship in self.me.ships if ship.next_action != ShipAction.CONVERT]
+        if not ships:
+            return
+        blocked = np.zeros(self.size ** 2, dtype=bool)
+        blocked[[shipyard.position.to_index(self.size) for shipyard in self.me.shipyards
+                 if shipyard.next_action == ShipyardAction.SPAWN]] = True
+        evaluator = MoveEvaluator(self.board, self.board_radar, ships)
+
+        scores = np.where(evaluator.table(blocked) == MOVE, 0.0, -np.inf)
+        scores[:, MOVE_CODES[(0, 0)]] = 1
+        rows = np.arange(len(ships))
+        orders = [ship.next_action.value if ship.next_action else MOVE_CODES[(0, 0)] for ship in ships]
+        scores[rows, orders] = 2
+
+        positions = np.array([ship.position.to_index(self.size) for ship in ships])
+        for ship, code in zip(ships, resolve_moves(positions, scores, self.size, blocked)):
+            if code >= 0:
+                ship.next_action = SHIP_ACTIONS.get(int(code))
+
+    def play(self, radar_dis=2, deposit_halite=500, security_dis=1, convert_sum: float = 1000, max_ship=5,
+             joint_moves: bool = False, fleet_targets: bool = False, hazard_cost: float = 0):
         """
         Main Function
 
         Regular flow: SPAWN -> CONVERT -> SHIP MOVE.
         Ending case: CONVERT all ships with enough halite.
+        If joint_moves, the ship moves are finally resolved for the whole fleet at once, see resolve_fleet_moves.
+        If fleet_targets, exploring ships head to distinct destinations, see allocate_fleet_targets.
+        If hazard_cost, deposit routes avoid the cells next to enemy ships, see get_shipyard_routes.
         """
+        self.hazard_cost = hazard_cost
         # print('MY TURN {}'.format(self.board.observation['step']))
 
         self.convert_base_command()
@@ -485,6 +598,8 @@ class SilverBot:
             self.get_map()
             # print('Global Mean Halite: {}'.format(self.global_halite_mean))
             self.spawn_command(max_ship)
+            if fleet_targets:
+                self.allocate_fleet_targets(radar_dis, deposit_halite)
             for ship in self.me.ships:
                 # print('-- command {}'.format(ship.id))
                 self.ship_command(ship, radar_dis, deposit_halite, security_dis, convert_sum)
@@ -492,5 +607,7 @@ class SilverBot:
                 # print('---- ship state: {}'.format(self.ship_state[ship.id]))
                 # print('---- ship next action: {}'.format(ship.next_action))
                 # print('---- ship halite: {}'.format(ship.halite))
+            if joint_moves:
+                self.resolve_fleet_moves()
 
         return self.me.next_actions
@@ -1,6 +1,8 @@
+from functools import lru_cache
+
 import numpy as np
 
-from kaggle_helpers import Point
+from kaggle_helpers import Point, point_table
 
 
 ###################
@@ -12,18 +14,42 @@ def index_to_position(index: int, size: int):
     """
     Converts an index in the observation.halite list to a 2d position in the form (x, y).
     """
-    y, x = divmod(index, size)
-    return Point(x, (size - y - 1))
+    return Point.from_index(index, size)
 
 
-# TODO: refactor for vectorized calculation
 def cal_dis(x, y):
     """
-    Calculate Manhattan Distance for two points
+    Calculate Manhattan Distance for two points.
+    Note: the board wraparound is ignored, see distance_table for the toroidal distance used by the bots.
     """
     return sum(abs(x - y))
 
 
+@lru_cache(maxsize=None)
+def distance_table(size: int) -> np.ndarray:
+    """
+    Toroidal Manhattan Distance between every pair of cells, shared per board size.
+    table[i, j] is the number of moves between observation.halite indexes i and j, taking the shorter way around
+    the board in each dimension. The table is read only.
+    """
+    line = np.arange(size)
+    # Shorter distance between two coordinates on a ring of given size
+    ring = np.abs(line[:, None] - line[None, :])
+    ring = np.minimum(ring, size - ring)
+    rows, cols = np.divmod(np.arange(size * size), size)
+    table = ring[rows[:, None], rows[None, :]] + ring[cols[:, None], cols[None, :]]
+    table.setflags(write=False)
+    return table
+
+
+def distances_from(index: int, size: int) -> np.ndarray:
+    """
+    Toroidal Manhattan Distance from the cell at index to every cell, indexed like observation.halite.
+    Example: distances_from(ship.position.to_index(size), size)[indexes] gives distances to many cells at once.
+    """
+    return distance_table(size)[index]
+
+
 def estimate_gain(halite, dis, t, collect_rate=0.25, regen_rate=0.02):
     """
     Calculate halite gain for given number of turn.
@@ -37,12 +63,52 @@ def estimate_gain(halite, dis, t, collect_rate=0.25, regen_rate=0.02):
         return new_halite * (1 - (1 - collect_rate) ** (t - dis))
 
 
+@lru_cache(maxsize=None)
+def gain_tables(collect_rate: float, regen_rate: float, length: int):
+    """
+    Lookup tables for estimate_gain_grid, shared per configuration.
+    Returns (regen_table, collect_table) where regen_table[d] = (1 + regen_rate) ** d and
+    collect_table[k] = 1 - (1 - collect_rate) ** k, for 0 <= d, k < length. Both tables are read only.
+    """
+    powers = np.arange(length)
+    regen_table = (1 + regen_rate) ** powers
+    collect_table = 1 - (1 - collect_rate) ** powers
+    regen_table.setflags(write=False)
+    collect_table.setflags(write=False)
+    return regen_table, collect_table
+
+
+def estimate_gain_grid(halite, dis, turns, collect_rate=0.25, regen_rate=0.02) -> np.ndarray:
+    """
+    Vectorized estimate_gain over many cells and turns at once.
+    Args:
+        halite: Array of cell halite, e.g. the (size, size) halite grid.
+        dis: Array of distances broadcastable with halite, e.g. distances_from(index, size).reshape(size, size).
+        turns: Sequence of T numbers of turns.
+        collect_rate: Configuration collectRate.
+        regen_rate: Configuration regenRate.
+
+    Returns: Array of shape (T, *broadcast shape), gain[i] is estimate_gain(halite, dis, turns[i]) for every cell.
+    """
+    halite, dis = np.broadcast_arrays(np.asarray(halite, dtype=float), np.asarray(dis))
+    turns = np.asarray(turns).reshape((-1,) + (1,) * halite.ndim)
+    length = int(turns.max()) + 1
+    regen_table, collect_table = gain_tables(collect_rate, regen_rate, length)
+    # Halite will regenerate before ship arrives, only cells with dis < t are reachable so the index is clipped
+    new_halite = halite * regen_table[np.clip(dis - 1, 0, length - 1)]
+    # Ship costs (dis) rounds to arrive destination, uses (t - dis) rounds to collect halite
+    collect_turns = turns - dis
+    gain = new_halite * collect_table[np.clip(collect_turns, 0, length - 1)]
+    return np.where(collect_turns > 0, gain, 0.0)
+
+
 def unify_pos(pos, size):
     """
     Convert position into standard one.
     Example: Given size = 5, Point(-2, -7) -> Point(3, 3)
+    Returns the interned point of point_table(size), see Point.translate to wrap pos + offset in one lookup.
     """
-    return pos % size
+    return point_table(size).get(pos[0], pos[1])
 
 
 def get_shorter_move(move, size):
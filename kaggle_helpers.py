@@ -14,8 +14,9 @@
 
 from copy import deepcopy
 from enum import Enum, auto
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import *
+import itertools
 import operator
 import sys
 
@@ -29,9 +30,12 @@ class Point(tuple):
     Note that this differs from arrays where the top left is (0, 0) and the bottom right is (size - 1, size - 1).
     Note that operators in this class do not constrain points to the board.
     You can generally constrain a point to the board by calling point % board.configuration.size.
+    Points on the board can be interned with point_table(size), translate() and from_index() return interned points.
     """
+    __slots__ = ()
+
     def __new__(cls: Type['Point'], x: int, y: int):
-        return super(Point, cls).__new__(cls, tuple((x, y)))
+        return tuple.__new__(cls, (x, y))
 
     @property
     def x(self):
@@ -48,57 +52,102 @@ class Point(tuple):
         return Point(f(self[0], other[0]), f(self[1], other[1]))
 
     def translate(self, offset: 'Point', size: int):
-        """Translates the current point by offset and wraps it around a board of width and height size"""
-        return (self + offset) % size
+        """
+        Translates the current point by offset and wraps it around a board of width and height size.
+        Returns the interned point of point_table(size), no point is created.
+        """
+        return point_table(size).translate(self, offset)
 
     def to_index(self, size: int):
         """
         Converts a 2d position in the form (x, y) to an index in the observation.halite list.
         See index_to_position for the inverse.
         """
-        return (size - self.y - 1) * size + self.x
+        return (size - self[1] - 1) * size + self[0]
 
     @staticmethod
     def from_index(index: int, size: int) -> 'Point':
         """
         Converts an index in the observation.halite list to a 2d position in the form (x, y).
         See position_to_index for the inverse.
+        Raises IndexError if index is not in [0, size * size).
         """
-        y, x = divmod(index, size)
-        return Point(x, (size - y - 1))
+        if not 0 <= index < size * size:
+            raise IndexError(f'Index {index} is out of a board of size {size}.')
+        return point_table(size).by_index[index]
 
     def __abs__(self) -> 'Point':
-        return self.map(operator.abs)
+        return Point(abs(self[0]), abs(self[1]))
 
     def __add__(self, other: Union[Tuple[int, int], 'Point']) -> 'Point':
-        return self.map2(other, operator.add)
+        return Point(self[0] + other[0], self[1] + other[1])
 
     def __eq__(self, other: Union[Tuple[int, int], 'Point']) -> bool:
+        if type(other) is Point:
+            return tuple.__eq__(self, other)
         try:
             return self[0] == other[0] and self[1] == other[1]
         except (TypeError, IndexError):
             return False
 
     def __floordiv__(self, denominator: int) -> 'Point':
-        return self.map(lambda x: x // denominator)
+        return Point(self[0] // denominator, self[1] // denominator)
 
-    def __hash__(self) -> int:
-        return hash((self.x, self.y))
+    # Same value as hash((self.x, self.y)) without a Python level call
+    __hash__ = tuple.__hash__
 
     def __mod__(self, mod: int) -> 'Point':
-        return self.map(lambda x: x % mod)
+        return Point(self[0] % mod, self[1] % mod)
 
     def __mul__(self, factor: int) -> 'Point':
-        return self.map(lambda x: x * factor)
+        return Point(self[0] * factor, self[1] * factor)
 
     def __neg__(self) -> 'Point':
-        return self.map(operator.neg)
+        return Point(-self[0], -self[1])
 
     def __str__(self):
-        return f"({self.x}, {self.y})"
+        return f"({self[0]}, {self[1]})"
 
     def __sub__(self, other: Union[Tuple[int, int], 'Point']) -> 'Point':
-        return self.map2(other, operator.sub)
+        return Point(self[0] - other[0], self[1] - other[1])
+
+
+class PointTable:
+    """
+    One canonical Point per cell of a size x size board, with precomputed neighbors.
+    Lookups return the interned points, so wrapping and translating positions allocates nothing.
+    """
+    __slots__ = ('size', 'points', 'by_index', 'neighbors')
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        # points[x * size + y] is Point(x, y)
+        self.points: List[Point] = [Point(x, y) for x in range(size) for y in range(size)]
+        # by_index[index] is Point.from_index(index, size)
+        self.by_index: List[Point] = [
+            self.points[x * size + (size - row - 1)] for row in range(size) for x in range(size)
+        ]
+        # neighbors[point] is the (north, east, south, west) neighbors of point
+        self.neighbors: Dict[Point, Tuple[Point, Point, Point, Point]] = {
+            point: tuple(self.get(point[0] + dx, point[1] + dy) for dx, dy in [(0, 1), (1, 0), (0, -1), (-1, 0)])
+            for point in self.points
+        }
+
+    def get(self, x: int, y: int) -> Point:
+        """Returns the interned point at (x, y) wrapped around the board."""
+        size = self.size
+        return self.points[x % size * size + y % size]
+
+    def translate(self, point: Union[Tuple[int, int], Point], offset: Union[Tuple[int, int], Point]) -> Point:
+        """Returns the interned point at point + offset wrapped around the board."""
+        size = self.size
+        return self.points[(point[0] + offset[0]) % size * size + (point[1] + offset[1]) % size]
+
+
+@lru_cache(maxsize=None)
+def point_table(size: int) -> PointTable:
+    """Returns the shared PointTable of a size x size board."""
+    return PointTable(size)
 
 
 TElement = TypeVar('TElement')
@@ -259,13 +308,7 @@ class ShipAction(Enum):
         SOUTH -> (0, -1)
         WEST -> (-1, 0)
         """
-        return (
-            Point(0, 1) if self == ShipAction.NORTH else
-            Point(1, 0) if self == ShipAction.EAST else
-            Point(0, -1) if self == ShipAction.SOUTH else
-            Point(-1, 0) if self == ShipAction.WEST else
-            None
-        )
+        return _ACTION_OFFSETS.get(self)
 
     def __str__(self) -> str:
         return self.name
@@ -280,6 +323,14 @@ class ShipAction(Enum):
         ]
 
 
+_ACTION_OFFSETS = {
+    ShipAction.NORTH: Point(0, 1),
+    ShipAction.EAST: Point(1, 0),
+    ShipAction.SOUTH: Point(0, -1),
+    ShipAction.WEST: Point(-1, 0),
+}
+
+
 class ShipyardAction(Enum):
     SPAWN = auto()
 
@@ -293,11 +344,15 @@ PlayerId = NewType('PlayerId', int)
 
 
 class Cell:
+    # Cells reference their ship and shipyard directly, the references are kept by Board._add_ship,
+    # Board._delete_ship, Board._add_shipyard and Board._delete_shipyard.
+    __slots__ = ('_position', '_halite', '_shipyard', '_ship', '_board')
+
     def __init__(self, position: Point, halite: float, shipyard_id: Optional[ShipyardId], ship_id: Optional[ShipId], board: 'Board') -> None:
         self._position = position
         self._halite = halite
-        self._shipyard_id = shipyard_id
-        self._ship_id = ship_id
+        self._shipyard = None if shipyard_id is None else board.shipyards.get(shipyard_id)
+        self._ship = None if ship_id is None else board.ships.get(ship_id)
         self._board = board
 
     @property
@@ -310,26 +365,25 @@ class Cell:
 
     @property
     def shipyard_id(self) -> Optional[ShipyardId]:
-        return self._shipyard_id
+        return None if self._shipyard is None else self._shipyard._id
 
     @property
     def ship_id(self) -> Optional[ShipId]:
-        return self._ship_id
+        return None if self._ship is None else self._ship._id
 
     @property
     def ship(self) -> Optional['Ship']:
         """Returns the ship on this cell if it exists and None otherwise."""
-        return self._board.ships.get(self.ship_id)
+        return self._ship
 
     @property
     def shipyard(self) -> Optional['Shipyard']:
         """Returns the shipyard on this cell if it exists and None otherwise."""
-        return self._board.shipyards.get(self.shipyard_id)
+        return self._shipyard
 
     def neighbor(self, offset: Point) -> 'Cell':
         """Returns the cell at self.position + offset."""
-        (x, y) = self.position + offset
-        return self._board[x, y]
+        return self._board._cells[self.position.translate(offset, self._board.configuration.size)]
 
     @property
     def north(self) -> 'Cell':
@@ -353,6 +407,9 @@ class Cell:
 
 
 class Ship:
+    # _cell and _player cache the ship's cell and owner, _cell is reset to None whenever _position changes.
+    __slots__ = ('_id', '_position', '_halite', '_player_id', '_board', '_next_action', '_cell', '_player')
+
     def __init__(self, ship_id: ShipId, position: Point, halite: int, player_id: PlayerId, board: 'Board', next_action: Optional[ShipAction] = None) -> None:
         self._id = ship_id
         self._position = position
@@ -360,6 +417,8 @@ class Ship:
         self._player_id = player_id
         self._board = board
         self._next_action = next_action
+        self._cell = None
+        self._player = None
 
     @property
     def id(self) -> ShipId:
@@ -380,12 +439,16 @@ class Ship:
     @property
     def cell(self) -> Cell:
         """Returns the cell this ship is on."""
-        return self._board[self.position]
+        if self._cell is None:
+            self._cell = self._board[self._position]
+        return self._cell
 
     @property
     def player(self) -> 'Player':
         """Returns the player that owns this ship."""
-        return self._board.players[self.player_id]
+        if self._player is None:
+            self._player = self._board.players[self._player_id]
+        return self._player
 
     @property
     def next_action(self) -> Optional[ShipAction]:
@@ -404,12 +467,17 @@ class Ship:
 
 
 class Shipyard:
+    # _cell and _player cache the shipyard's cell and owner, shipyards never move.
+    __slots__ = ('_id', '_position', '_player_id', '_board', '_next_action', '_cell', '_player')
+
     def __init__(self, shipyard_id: ShipyardId, position: Point, player_id: PlayerId, board: 'Board', next_action: Optional[ShipyardAction] = None) -> None:
         self._id = shipyard_id
         self._position = position
         self._player_id = player_id
         self._board = board
         self._next_action = next_action
+        self._cell = None
+        self._player = None
 
     @property
     def id(self) -> ShipyardId:
@@ -426,11 +494,15 @@ class Shipyard:
     @property
     def cell(self) -> Cell:
         """Returns the cell this shipyard is on."""
-        return self._board[self.position]
+        if self._cell is None:
+            self._cell = self._board[self._position]
+        return self._cell
 
     @property
     def player(self) -> 'Player':
-        return self._board.players[self.player_id]
+        if self._player is None:
+            self._player = self._board.players[self._player_id]
+        return self._player
 
     @property
     def next_action(self) -> ShipyardAction:
@@ -449,12 +521,21 @@ class Shipyard:
 
 
 class Player:
+    # Ids are kept in insertion ordered dicts (used as ordered sets) so a ship or shipyard is removed in O(1).
+    # The id and entity lists are built on first access and cached until the board calls _invalidate().
+    __slots__ = ('_id', '_halite', '_shipyard_ids', '_ship_ids', '_board', '_cache')
+
     def __init__(self, player_id: PlayerId, halite: int, shipyard_ids: List[ShipyardId], ship_ids: List[ShipId], board: 'Board') -> None:
         self._id = player_id
         self._halite = halite
-        self._shipyard_ids = shipyard_ids
-        self._ship_ids = ship_ids
+        self._shipyard_ids: Dict[ShipyardId, None] = dict.fromkeys(shipyard_ids)
+        self._ship_ids: Dict[ShipId, None] = dict.fromkeys(ship_ids)
         self._board = board
+        self._cache: Dict[str, list] = {}
+
+    def _invalidate(self) -> None:
+        """Drops the cached ship and shipyard lists, called by the board whenever it changes the id sets."""
+        self._cache = {}
 
     @property
     def id(self) -> PlayerId:
@@ -466,27 +547,37 @@ class Player:
 
     @property
     def shipyard_ids(self) -> List[ShipyardId]:
-        return self._shipyard_ids
+        """Returns the ids of all shipyards owned by this player. The list is cached and must not be modified."""
+        cache = self._cache
+        if 'shipyard_ids' not in cache:
+            cache['shipyard_ids'] = list(self._shipyard_ids)
+        return cache['shipyard_ids']
 
     @property
     def ship_ids(self) -> List[ShipId]:
-        return self._ship_ids
+        """Returns the ids of all ships owned by this player. The list is cached and must not be modified."""
+        cache = self._cache
+        if 'ship_ids' not in cache:
+            cache['ship_ids'] = list(self._ship_ids)
+        return cache['ship_ids']
 
     @property
     def shipyards(self) -> List[Shipyard]:
-        """Returns all shipyards owned by this player."""
-        return [
-            self._board.shipyards[shipyard_id]
-            for shipyard_id in self.shipyard_ids
-        ]
+        """Returns all shipyards owned by this player. The list is cached and must not be modified."""
+        cache = self._cache
+        if 'shipyards' not in cache:
+            shipyards = self._board.shipyards
+            cache['shipyards'] = [shipyards[shipyard_id] for shipyard_id in self._shipyard_ids]
+        return cache['shipyards']
 
     @property
     def ships(self) -> List[Ship]:
-        """Returns all ships owned by this player."""
-        return [
-            self._board.ships[ship_id]
-            for ship_id in self.ship_ids
-        ]
+        """Returns all ships owned by this player. The list is cached and must not be modified."""
+        cache = self._cache
+        if 'ships' not in cache:
+            ships = self._board.ships
+            cache['ships'] = [ships[ship_id] for ship_id in self._ship_ids]
+        return cache['ships']
 
     @property
     def is_current_player(self) -> bool:
@@ -517,12 +608,62 @@ class Player:
 # endregion
 
 
+class LazyCells(dict):
+    """
+    Cell dict of a lazy Board, a cell is created from the observation halite the first time it is looked up.
+    Cells holding a ship or shipyard are always materialized since _add_ship and _add_shipyard reach them.
+    Only item lookup materializes, iterate Board.cells (which calls materialize()) to see every cell.
+    """
+    def __init__(self, halite: List[float], board: 'Board') -> None:
+        super().__init__()
+        self._halite = halite
+        self._board = board
+        self._complete = False
+
+    def __missing__(self, position: Point) -> Cell:
+        size = self._board.configuration.size
+        cell = Cell(position, self._halite[position.to_index(size)], None, None, self._board)
+        self[position] = cell
+        return cell
+
+    def materialize(self) -> 'LazyCells':
+        """Creates every missing cell, keeping the cell order of an eager Board, and returns self."""
+        if not self._complete:
+            size = self._board.configuration.size
+            cells = [self[position] for position in point_table(size).points]
+            self.clear()
+            self.update((cell.position, cell) for cell in cells)
+            self._complete = True
+        return self
+
+    def copy_to(self, board: 'Board') -> 'LazyCells':
+        """Returns a lazy copy of these cells for board, without their ships and shipyards."""
+        cells = _copy_cells(self, LazyCells(self._halite, board), board)
+        cells._complete = self._complete
+        return cells
+
+
+def _copy_cells(cells: Dict[Point, 'Cell'], copies: Dict[Point, 'Cell'], board: 'Board') -> Dict[Point, 'Cell']:
+    """Fills copies with a copy of every cell of cells for board, without their ships and shipyards."""
+    new = object.__new__
+    for position, cell in cells.items():
+        copy = new(Cell)
+        copy._position = position
+        copy._halite = cell._halite
+        copy._shipyard = None
+        copy._ship = None
+        copy._board = board
+        copies[position] = copy
+    return copies
+
+
 class Board:
     def __init__(
         self,
         raw_observation: Dict[str, Any],
         raw_configuration: Union[Configuration, Dict[str, Any]],
-        next_actions: Optional[List[Dict[str, str]]] = None
+        next_actions: Optional[List[Dict[str, str]]] = None,
+        lazy: bool = False
     ) -> None:
         """
         Creates a board from the provided observation, configuration, and next_actions as specified by
@@ -533,6 +674,8 @@ class Board:
             [ship.halite for player in board.players for ship in player.ships]
             ship.player.shipyards[0].cell.north.east.ship
         Consumers should not set or modify any attributes except Ship.next_action and Shipyard.next_action
+        If lazy is True, a cell is only created when it is first accessed (see LazyCells), so construction cost is
+        proportional to the cells an agent actually reads rather than to the board area.
         """
         observation = Observation(raw_observation)
         # next_actions is effectively a Dict[Union[[ShipId, ShipAction], [ShipyardId, ShipyardAction]]]
@@ -547,12 +690,17 @@ class Board:
         self._ships: Dict[ShipId, Ship] = {}
         self._shipyards: Dict[ShipyardId, Shipyard] = {}
         self._cells: Dict[Point, Cell] = {}
+        # Built on demand by update()
+        self._cells_by_index: Optional[List[Cell]] = None
+        self._dirty_cells: Optional[Set[Point]] = None
 
         size = self.configuration.size
-        # Create a cell for every point in a size x size grid
-        for x in range(size):
-            for y in range(size):
-                position = Point(x, y)
+        self._points = point_table(size)
+        if lazy:
+            self._cells = LazyCells(observation.halite, self)
+        else:
+            # Create a cell for every point in a size x size grid
+            for position in self._points.points:
                 halite = observation.halite[position.to_index(size)]
                 # We'll populate the cell's ships and shipyards in _add_ship and _add_shipyard
                 self.cells[position] = Cell(position, halite, None, None, self)
@@ -607,6 +755,8 @@ class Board:
     @property
     def cells(self) -> Dict[Point, Cell]:
         """Returns all cells on the current board."""
+        if isinstance(self._cells, LazyCells):
+            return self._cells.materialize()
         return self._cells
 
     @property
@@ -645,18 +795,74 @@ class Board:
         }
 
     def __deepcopy__(self, _) -> 'Board':
-        actions = [player.next_actions for player in self.players.values()]
-        return Board(self.observation, self.configuration, actions)
+        """
+        Clones the board entity by entity.
+        The clone is the same as Board(self.observation, self.configuration, next_actions), including entity order,
+        but skips serializing every cell and player into an observation and parsing it back. Entities are copied slot
+        by slot and linked to their cells in the same pass, the id maps are copied as they are.
+        """
+        new = object.__new__
+        board = new(Board)
+        board._step = self._step
+        board._configuration = self._configuration
+        board._current_player_id = self._current_player_id
+        board._points = self._points
+        board._players = players = {}
+        board._ships = ships = {}
+        board._shipyards = shipyards = {}
+        board._cells_by_index = None
+        board._dirty_cells = None
+        if isinstance(self._cells, LazyCells):
+            board._cells = cells = self._cells.copy_to(board)
+        else:
+            board._cells = cells = _copy_cells(self._cells, {}, board)
+
+        for player_id, player in self._players.items():
+            player_clone = new(Player)
+            player_clone._id = player_id
+            player_clone._halite = player._halite
+            player_clone._shipyard_ids = dict(player._shipyard_ids)
+            player_clone._ship_ids = dict(player._ship_ids)
+            player_clone._board = board
+            player_clone._cache = {}
+            players[player_id] = player_clone
+        # Ships and shipyards follow the players' id order, as the Board constructor adds them.
+        for player_id, player in self._players.items():
+            player_clone = players[player_id]
+            for ship_id in player._ship_ids:
+                ship = self._ships[ship_id]
+                clone = new(Ship)
+                clone._id = ship_id
+                clone._position = ship._position
+                clone._halite = ship._halite
+                clone._player_id = player_id
+                clone._board = board
+                clone._next_action = ship._next_action
+                clone._cell = cell = cells[ship._position]
+                clone._player = player_clone
+                cell._ship = clone
+                ships[ship_id] = clone
+            for shipyard_id in player._shipyard_ids:
+                shipyard = self._shipyards[shipyard_id]
+                clone = new(Shipyard)
+                clone._id = shipyard_id
+                clone._position = shipyard._position
+                clone._player_id = player_id
+                clone._board = board
+                clone._next_action = shipyard._next_action
+                clone._cell = cell = cells[shipyard._position]
+                clone._player = player_clone
+                cell._shipyard = clone
+                shipyards[shipyard_id] = clone
+        return board
 
     def __getitem__(self, point: Union[Tuple[int, int], Point]) -> Cell:
         """
         This method will wrap the supplied position to fit within the board size and return the cell at that location.
         e.g. on a 3x3 board, board[2, 1] is the same as board[5, 1]
         """
-        if not isinstance(point, Point):
-            (x, y) = point
-            point = Point(x, y)
-        return self._cells[point % self.configuration.size]
+        (x, y) = point
+        return self._cells[self._points.get(x, y)]
 
     def __str__(self) -> str:
         """
@@ -690,27 +896,139 @@ class Board:
             result += '|\n'
         return result
 
+    @property
+    def dirty_cells(self) -> Set[Point]:
+        """
+        Returns the positions of cells changed by the last update(), every cell for a board that was never updated.
+        A cell is dirty when its ship or shipyard changed or its halite dropped (collection, conversion).
+        Regeneration, which raises the halite of almost every cell each turn, doesn't make a cell dirty.
+        """
+        if self._dirty_cells is None:
+            return set(self.cells)
+        return self._dirty_cells
+
+    def update(
+        self,
+        raw_observation: Dict[str, Any],
+        next_actions: Optional[List[Dict[str, str]]] = None
+    ) -> Set[Point]:
+        """
+        Updates this board in place to the state of raw_observation, normally the observation of the next turn.
+        The result is the same as Board(raw_observation, self.configuration, next_actions) but only changed cells
+        and the ships and shipyards that moved, appeared or disappeared are touched.
+        Returns the dirty cells, see dirty_cells.
+        """
+        observation = Observation(raw_observation)
+        next_actions = next_actions or ([{}] * len(observation.players))
+        size = self.configuration.size
+        if len(observation.players) != len(self._players):
+            raise ValueError('Board.update() requires the same number of players as the board.')
+        if self._cells_by_index is None:
+            self._cells_by_index = [self._cells[Point.from_index(index, size)] for index in range(size * size)]
+        cells_by_index = self._cells_by_index
+        dirty_cells = set()
+
+        self._step = observation.step
+        self._current_player_id = observation.player
+
+        for cell, halite in zip(cells_by_index, observation.halite):
+            if cell._halite != halite:
+                if halite < cell._halite:
+                    dirty_cells.add(cell.position)
+                cell._halite = halite
+
+        # Entities that disappeared or moved leave their cell first so no other entity's cell is cleared later.
+        ships, shipyards = {}, {}
+        for (player_id, [_, player_shipyards, player_ships]) in enumerate(observation.players):
+            for (ship_id, [ship_index, _]) in player_ships.items():
+                ships[ship_id] = (player_id, cells_by_index[ship_index])
+            for (shipyard_id, shipyard_index) in player_shipyards.items():
+                shipyards[shipyard_id] = (player_id, cells_by_index[shipyard_index])
+        for ship in self._ships.values():
+            new_ship = ships.get(ship.id)
+            if new_ship is None or new_ship[0] != ship.player_id or new_ship[1].position != ship.position:
+                cell = ship.cell
+                if cell._ship is ship:
+                    cell._ship = None
+                dirty_cells.add(ship.position)
+        for shipyard in self._shipyards.values():
+            new_shipyard = shipyards.get(shipyard.id)
+            if new_shipyard is None or new_shipyard[0] != shipyard.player_id:
+                cell = shipyard.cell
+                if cell._shipyard is shipyard:
+                    cell._shipyard = None
+                dirty_cells.add(shipyard.position)
+
+        old_ships, old_shipyards = self._ships, self._shipyards
+        self._ships, self._shipyards = {}, {}
+        for (player_id, [player_halite, player_shipyards, player_ships]) in enumerate(observation.players):
+            player = self._players[player_id]
+            player._halite = player_halite
+            player._ship_ids = dict.fromkeys(player_ships)
+            player._shipyard_ids = dict.fromkeys(player_shipyards)
+            player._invalidate()
+            player_actions = next_actions[player_id] or {}
+
+            for (ship_id, [ship_index, ship_halite]) in player_ships.items():
+                cell = cells_by_index[ship_index]
+                raw_action = player_actions.get(ship_id)
+                action = ShipAction[raw_action] if raw_action in ShipAction.__members__ else None
+                ship = old_ships.get(ship_id)
+                if ship is None or ship.player_id != player_id:
+                    ship = Ship(ship_id, cell.position, ship_halite, player_id, self, action)
+                    dirty_cells.add(cell.position)
+                else:
+                    if ship._position != cell.position:
+                        ship._position = cell.position
+                        ship._cell = cell
+                        dirty_cells.add(cell.position)
+                    ship._halite = ship_halite
+                    ship._next_action = action
+                cell._ship = ship
+                self._ships[ship_id] = ship
+
+            for (shipyard_id, shipyard_index) in player_shipyards.items():
+                cell = cells_by_index[shipyard_index]
+                raw_action = player_actions.get(shipyard_id)
+                action = ShipyardAction[raw_action] if raw_action in ShipyardAction.__members__ else None
+                shipyard = old_shipyards.get(shipyard_id)
+                if shipyard is None or shipyard.player_id != player_id:
+                    shipyard = Shipyard(shipyard_id, cell.position, player_id, self, action)
+                    cell._shipyard = shipyard
+                    dirty_cells.add(cell.position)
+                else:
+                    shipyard._next_action = action
+                cell._halite = 0
+                self._shipyards[shipyard_id] = shipyard
+
+        self._dirty_cells = dirty_cells
+        return dirty_cells
+
     def _add_ship(self: 'Board', ship: Ship) -> None:
-        ship.player.ship_ids.append(ship.id)
-        ship.cell._ship_id = ship.id
+        ship.player._ship_ids[ship.id] = None
+        ship.player._invalidate()
+        ship.cell._ship = ship
         self._ships[ship.id] = ship
 
     def _add_shipyard(self: 'Board', shipyard: Shipyard) -> None:
-        shipyard.player.shipyard_ids.append(shipyard.id)
-        shipyard.cell._shipyard_id = shipyard.id
+        shipyard.player._shipyard_ids[shipyard.id] = None
+        shipyard.player._invalidate()
+        shipyard.cell._shipyard = shipyard
         shipyard.cell._halite = 0
         self._shipyards[shipyard.id] = shipyard
 
     def _delete_ship(self: 'Board', ship: Ship) -> None:
-        ship.player.ship_ids.remove(ship.id)
-        if ship.cell.ship_id == ship.id:
-            ship.cell._ship_id = None
+        del ship.player._ship_ids[ship.id]
+        ship.player._invalidate()
+        if ship.cell._ship is ship:
+            ship.cell._ship = None
         del self._ships[ship.id]
 
     def _delete_shipyard(self: 'Board', shipyard: Shipyard) -> None:
-        shipyard.player.shipyard_ids.remove(shipyard.id)
-        if shipyard.cell.shipyard_id == shipyard.id:
-            shipyard.cell._shipyard_id = None
+        del shipyard.player._shipyard_ids[shipyard.id]
+        shipyard.player._invalidate()
+        if shipyard.cell._shipyard is shipyard:
+            shipyard.cell._shipyard = None
         del self._shipyards[shipyard.id]
 
     def next(self) -> 'Board':
@@ -722,10 +1040,70 @@ class Board:
         """
         # Create a copy of the board to modify so we don't affect the current board
         board = deepcopy(self)
-        configuration = board.configuration
+        board._apply_actions()
+        return board
+
+    def apply(self) -> 'BoardUndo':
+        """
+        Applies the current board's next actions in place and returns the record to roll them back with undo().
+        The result is the same board next() would return, without copying the board. This can form a search, e.g.
+            record = board.apply()
+            ... evaluate board ...
+            board.undo(record)
+        Records must be undone in reverse order of application.
+        The record holds the fields of the entities, the cells holding units and one list of the cells' halite, which
+        every turn changes through regeneration. Entity dicts and id lists are only copied on a turn that creates or
+        destroys units.
+        """
+        record = BoardUndo(self)
+        for unit in itertools.chain(self._ships.values(), self._shipyards.values()):
+            record.save_cell(self._cells[unit.position])
+        self._apply_actions(record)
+        return record
+
+    def undo(self, record: 'BoardUndo') -> None:
+        """Rolls back the turn applied by apply() that returned record."""
+        for cell, (halite, ship, shipyard) in record.cells.items():
+            cell._halite = halite
+            cell._ship = ship
+            cell._shipyard = shipyard
+        for ship, position, halite, next_action in record.ships:
+            if ship._position != position:
+                ship._position = position
+                ship._cell = None
+            ship._halite = halite
+            ship._next_action = next_action
+        for cell, halite in zip(self._cells.values(), record.halite):
+            cell._halite = halite
+        for shipyard, next_action in record.shipyards:
+            shipyard._next_action = next_action
+        for player, halite in record.players:
+            player._halite = halite
+        for player, (shipyard_ids, ship_ids) in record.player_ids.items():
+            player._shipyard_ids = shipyard_ids
+            player._ship_ids = ship_ids
+            player._invalidate()
+        if record.ship_dict is not None:
+            self._ships = record.ship_dict
+            self._shipyards = record.shipyard_dict
+        self._step = record.step
+
+    def _apply_actions(self, record: Optional['BoardUndo'] = None) -> None:
+        """
+        Applies the current board's next actions to this board in place, see next().
+        If record is given, every cell is saved into it before it is first modified.
+        """
+        configuration = self.configuration
         convert_cost = configuration.convert_cost
         spawn_cost = configuration.spawn_cost
         uid_counter = 0
+        if record is not None:
+            record.save_halite(self)
+
+        def changing(*players: Player) -> None:
+            # Called before units of players are created or destroyed
+            if record is not None:
+                record.save_entities(self, players)
 
         # This is a consistent way to generate unique strings to form ship and shipyard ids
         def create_uid():
@@ -734,14 +1112,15 @@ class Board:
             return f"{self.step + 1}-{uid_counter}"
 
         # Process actions and store the results in the ships and shipyards lists for collision checking
-        for player in board.players.values():
+        for player in self.players.values():
             leftover_convert_halite = 0
 
             for shipyard in player.shipyards:
                 if shipyard.next_action == ShipyardAction.SPAWN and player.halite >= spawn_cost:
                     # Handle SPAWN actions
                     player._halite -= spawn_cost
-                    board._add_ship(Ship(ShipId(create_uid()), shipyard.position, 0, player.id, board))
+                    changing(player)
+                    self._add_ship(Ship(ShipId(create_uid()), shipyard.position, 0, player.id, self))
                 # Clear the shipyard's action so it doesn't repeat the same action automatically
                 shipyard.next_action = None
 
@@ -755,15 +1134,17 @@ class Board:
                         # This is to prevent the edge case of chaining halite from one convert to fund other converts
                         leftover_convert_halite += max(delta_halite, 0)
                         player._halite += min(delta_halite, 0)
-                        board._add_shipyard(Shipyard(ShipyardId(create_uid()), ship.position, player.id, board))
-                        board._delete_ship(ship)
+                        changing(player)
+                        self._add_shipyard(Shipyard(ShipyardId(create_uid()), ship.position, player.id, self))
+                        self._delete_ship(ship)
                 elif ship.next_action is not None:
                     # If the action is not None and is not CONVERT it must be NORTH, SOUTH, EAST, or WEST
-                    ship.cell._ship_id = None
+                    ship.cell._ship = None
                     ship._position = ship.position.translate(ship.next_action.to_point(), configuration.size)
-                    ship._halite *= (1 - board.configuration.move_cost)
+                    ship._cell = None
+                    ship._halite *= (1 - self.configuration.move_cost)
                     # We don't set the new cell's ship_id here as it would be overwritten by another ship in the case of collision.
-                    # Later we'll iterate through all ships and re-set the cell._ship_id as appropriate.
+                    # Later we'll iterate through all ships and re-set the cell._ship as appropriate.
 
             player._halite += leftover_convert_halite
             # Lets just check and make sure.
@@ -787,34 +1168,38 @@ class Board:
             return None, ships
 
         # Check for ship to ship collisions
-        ship_collision_groups = group_by(board.ships.values(), lambda ship: ship.position)
+        ship_collision_groups = group_by(self.ships.values(), lambda ship: ship.position)
         for position, collided_ships in ship_collision_groups.items():
             winner, deleted = resolve_collision(collided_ships)
             if winner is not None:
-                winner.cell._ship_id = winner.id
+                if record is not None:
+                    record.save_cell(winner.cell)
+                winner.cell._ship = winner
             for ship in deleted:
-                board._delete_ship(ship)
+                changing(ship.player)
+                self._delete_ship(ship)
                 if winner is not None:
                     # Winner takes deleted ships' halite
                     winner._halite += ship.halite
 
         # Check for ship to shipyard collisions
-        for shipyard in list(board.shipyards.values()):
+        for shipyard in list(self.shipyards.values()):
             ship = shipyard.cell.ship
             if ship is not None and ship.player_id != shipyard.player_id:
                 # Ship to shipyard collision
-                board._delete_shipyard(shipyard)
-                board._delete_ship(ship)
+                changing(shipyard.player, ship.player)
+                self._delete_shipyard(shipyard)
+                self._delete_ship(ship)
 
         # Deposit halite from ships into shipyards
-        for shipyard in list(board.shipyards.values()):
+        for shipyard in list(self.shipyards.values()):
             ship = shipyard.cell.ship
             if ship is not None and ship.player_id == shipyard.player_id:
                 shipyard.player._halite += ship.halite
                 ship._halite = 0
 
         # Collect halite from cells into ships
-        for ship in board.ships.values():
+        for ship in self.ships.values():
             cell = ship.cell
             delta_halite = int(cell.halite * configuration.collect_rate)
             if ship.next_action not in ShipAction.moves() and cell.shipyard_id is None and delta_halite > 0:
@@ -824,16 +1209,61 @@ class Board:
             ship.next_action = None
 
         # Regenerate halite in cells
-        for cell in board.cells.values():
+        for cell in self.cells.values():
             if cell.ship_id is None:
                 next_halite = round(cell.halite * (1 + configuration.regen_rate), 3)
                 cell._halite = min(next_halite, configuration.max_cell_halite)
                 # Lets just check and make sure.
             assert cell.halite >= 0
 
-        board._step += 1
+        self._step += 1
 
-        return board
+
+class BoardUndo:
+    """
+    Compact record of a turn applied in place by Board.apply(), consumed by Board.undo().
+    It keeps the fields of every entity that existed before the turn, the cells' halite, the original units of every
+    cell the turn moved units on, and the entity dicts and id lists the turn replaced, if it created or destroyed
+    units.
+    """
+    def __init__(self, board: Board) -> None:
+        self.step = board.step
+        self.ships = [(ship, ship.position, ship.halite, ship.next_action) for ship in board.ships.values()]
+        self.shipyards = [(shipyard, shipyard.next_action) for shipyard in board.shipyards.values()]
+        self.players = [(player, player.halite) for player in board.players.values()]
+        # Set by save_entities
+        self.ship_dict: Optional[Dict[ShipId, Ship]] = None
+        self.shipyard_dict: Optional[Dict[ShipyardId, Shipyard]] = None
+        self.player_ids: Dict[Player, Tuple[Dict[ShipyardId, None], Dict[ShipId, None]]] = {}
+        # Halite of every cell in board.cells order, set by save_halite
+        self.halite: List[float] = []
+        # Keyed by the Cell itself, identity hashing is much cheaper than hashing its Point.
+        self.cells: Dict[Cell, Tuple[float, Optional[Ship], Optional[Shipyard]]] = {}
+
+    def save_cell(self, cell: Cell) -> None:
+        """Saves cell's current values unless it has already been saved."""
+        if cell not in self.cells:
+            self.cells[cell] = (cell._halite, cell._ship, cell._shipyard)
+
+    def save_halite(self, board: Board) -> None:
+        """Saves the halite of every cell, regeneration changes nearly all of them."""
+        self.halite = [cell._halite for cell in board.cells.values()]
+
+    def save_entities(self, board: Board, players: Iterable[Player]) -> None:
+        """
+        Saves the entity dicts of board and the id lists of players before they first change. They are replaced by
+        copies rather than mutated, so undo restores them in their original order.
+        """
+        if self.ship_dict is None:
+            self.ship_dict = board._ships
+            self.shipyard_dict = board._shipyards
+            board._ships = dict(board._ships)
+            board._shipyards = dict(board._shipyards)
+        for player in players:
+            if player not in self.player_ids:
+                self.player_ids[player] = (player._shipyard_ids, player._ship_ids)
+                player._shipyard_ids = dict(player._shipyard_ids)
+                player._ship_ids = dict(player._ship_ids)
 
 
 def board_agent(agent: Callable[[Board], None]):
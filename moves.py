@@ -0,0 +1,226 @@
+from typing import *
+
+import numpy as np
+
+from array_board import SHIP_ACTIONS, move_table
+from kaggle_helpers import *
+from radar import BoardRadar
+
+
+# Columns of the move tables follow the ship action codes of array_board: stay, NORTH, EAST, SOUTH, WEST.
+MOVE_CODES = {(0, 0): 0, (0, 1): 1, (1, 0): 2, (0, -1): 3, (-1, 0): 4}
+MOVES = tuple(MOVE_CODES)
+NUM_MOVES = len(MOVES)
+
+# Move cases of the bots' case_analysis, move tables hold their index.
+MOVE, DETOUR, WAIT = 0, 1, 2
+CASES = ('MOVE', 'DETOUR', 'WAIT')
+
+
+class MoveEvaluator:
+    """
+    Batched case_analysis of the bots for all ships of one player in one turn.
+    The parts of case_analysis fixed for the turn (occupancy, owners, cargo and threat) are computed once as
+    (num_ships, 5) masks. The parts that change while the bot gives orders, the reserved next positions and the
+    next_action of the ship on the target cell, are read when a case is asked for.
+    """
+
+    def __init__(self, board: Board, radar: BoardRadar, ships: List[Ship]) -> None:
+        array_board = radar.board
+        self.board = board
+        self.array_board = array_board
+        self.rows = {ship.id: row for row, ship in enumerate(ships)}
+
+        ship_rows = [array_board.ship_row(ship.id) for ship in ships]
+        position = array_board.ship_pos[ship_rows]
+        halite = array_board.ship_halite[ship_rows][:, None]
+        # target[row, code] is the cell reached by ship row with move code
+        target = array_board.moves[:NUM_MOVES, position].T
+        ship_owner = array_board.ship_owner[target]
+        ship_cargo = array_board.ship_cargo[target]
+        shipyard_owner = array_board.shipyard_owner[target]
+
+        # Check next_pos current occupation condition
+        has_ship = ship_owner >= 0
+        has_shipyard = shipyard_owner >= 0
+        enemy_ship = has_ship & (ship_owner != radar.player)
+        # DETOUR
+        detour = (enemy_ship & (ship_cargo <= halite)) | (has_shipyard & (shipyard_owner != radar.player))
+        # Move cases 1 to 3, case 4 (the ship on next_pos has an order) is checked when asked.
+        move_cases = (
+            (~has_ship & ~has_shipyard)
+            | (enemy_ship & ~has_shipyard & (ship_cargo > halite))
+            | (~has_ship & (shipyard_owner == radar.player))
+        )
+        # Check if there's any nearby enemy ship for next_pos
+        safe = halite < radar.threat(1)[target]
+
+        self.target = target
+        self.has_ship = has_ship
+        self.detour = detour
+        self.move_cases = move_cases
+        self.safe = safe
+        # Plain lists are faster than numpy for the single case lookups of the bots.
+        self._target = target.tolist()
+        self._has_ship = has_ship.tolist()
+        self._detour = detour.tolist()
+        self._move_cases = move_cases.tolist()
+        self._safe = safe.tolist()
+
+    def _has_order(self, index: int) -> bool:
+        ship_id = self.array_board.ship_ids[self.array_board.ship_index[index]]
+        return self.board.ships[ship_id].next_action is not None
+
+    def case(self, ship: Ship, move: Tuple[int, int], reserved: np.ndarray) -> str:
+        """
+        Same result as the bots' case_analysis(ship, move).
+        Args:
+            ship: Ship
+            move: Tuple
+            reserved: Bool array indexed like observation.halite, True on the next positions already taken.
+
+        Returns: 'MOVE', 'DETOUR' or 'WAIT'.
+        """
+        row, code = self.rows[ship.id], MOVE_CODES[move]
+        if self._detour[row][code]:
+            return 'DETOUR'
+        target = self._target[row][code]
+        move_case = self._move_cases[row][code] or (self._has_ship[row][code] and self._has_order(target))
+        if move_case and self._safe[row][code] and not reserved[target]:
+            return 'MOVE'
+        return 'WAIT'
+
+    def table(self, reserved: np.ndarray) -> np.ndarray:
+        """
+        Classify every (ship, move) at once.
+        Args:
+            reserved: Bool array indexed like observation.halite, True on the next positions already taken.
+
+        Returns: Int array of shape (num_ships, 5), the index in CASES of each ship and move code.
+        """
+        move_cases = self.move_cases.copy()
+        rows, codes = np.nonzero(self.has_ship & ~move_cases)
+        for row, code in zip(rows, codes):
+            move_cases[row, code] = self._has_order(self.target[row, code])
+        movable = move_cases & self.safe & ~reserved[self.target]
+        return np.where(self.detour, DETOUR, np.where(movable, MOVE, WAIT))
+
+
+def linear_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Min cost assignment of every row to a distinct column, by shortest augmenting paths (Hungarian algorithm).
+    Each row adds one augmenting path, and the Dijkstra steps along it are vectorized over the columns.
+    Args:
+        cost: Finite array of shape (rows, columns) with rows <= columns.
+
+    Returns: Int array of shape (rows,), the column assigned to each row.
+    """
+    num_rows, num_cols = cost.shape
+    if num_rows > num_cols:
+        raise ValueError('Assignment needs at least as many columns as rows.')
+    # Potentials and matching use 1-based rows and columns, column 0 is the virtual start of each path.
+    u = np.zeros(num_rows + 1)
+    v = np.zeros(num_cols + 1)
+    match = np.zeros(num_cols + 1, dtype=np.int64)
+    way = np.zeros(num_cols + 1, dtype=np.int64)
+    for row in range(1, num_rows + 1):
+        match[0] = row
+        col = 0
+        min_reduced = np.full(num_cols + 1, np.inf)
+        used = np.zeros(num_cols + 1, dtype=bool)
+        while match[col] != 0:
+            used[col] = True
+            current = match[col]
+            reduced = cost[current - 1] - u[current] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = col
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+            u[match[used]] += delta
+            v[used] -= delta
+            min_reduced[1:][free] -= delta
+            col = next_col
+        # Flip the augmenting path
+        while col:
+            prev_col = way[col]
+            match[col] = match[prev_col]
+            col = prev_col
+    assignment = np.empty(num_rows, dtype=np.int64)
+    cols = np.flatnonzero(match[1:])
+    assignment[match[1:][cols] - 1] = cols
+    return assignment
+
+
+def resolve_moves(positions: np.ndarray, scores: np.ndarray, size: int,
+                  blocked: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Collision free moves for a whole fleet at once, maximizing the total preference score.
+    Ships are matched to distinct next cells by min cost bipartite matching over (ship, next cell). Two ships
+    swapping cells don't collide in Halite, so only shared next cells are ruled out.
+    A ship left without any allowed free cell then takes any reachable cell no other ship took, preferring to stay,
+    even a move its scores forbid, so it's only unresolved when all its 5 cells are taken or blocked.
+    Args:
+        positions: Int array of shape (num_ships,), the index of each ship like observation.halite.
+        scores: Array of shape (num_ships, 5), preference of each move code (stay, NORTH, EAST, SOUTH, WEST),
+            -inf or nan forbids a move.
+        size: Board size.
+        blocked: Optional bool array indexed like observation.halite, cells no ship may take (e.g. spawns).
+
+    Returns: Int array of shape (num_ships,), the move code of each ship, -1 if it has no free cell.
+    """
+    num_ships = len(positions)
+    if num_ships == 0:
+        return np.zeros(0, dtype=np.int64)
+    target = move_table(size)[:NUM_MOVES, positions].T
+    codes = _match_moves(target, scores, blocked)
+    unresolved = codes < 0
+    if unresolved.any():
+        resolved = np.flatnonzero(~unresolved)
+        taken = np.zeros(size ** 2, dtype=bool)
+        taken[target[resolved, codes[resolved]]] = True
+        fallback = np.where(taken[target[unresolved]], -np.inf, 0.0)
+        fallback[:, MOVE_CODES[(0, 0)]] += 1
+        codes[unresolved] = _match_moves(target[unresolved], fallback, blocked)
+    return codes
+
+
+def _match_moves(target: np.ndarray, scores: np.ndarray, blocked: Optional[np.ndarray]) -> np.ndarray:
+    """
+    Matching of resolve_moves, target[row, code] is the cell reached by ship row with move code.
+    Returns the move code of each ship, -1 if it has no allowed free cell.
+    """
+    num_ships = len(target)
+    allowed = np.isfinite(scores)
+    if blocked is not None:
+        allowed &= ~blocked[target]
+    cells, cell_col = np.unique(target, return_inverse=True)
+    cell_col = cell_col.reshape(target.shape)
+
+    # Scores become costs relative to each ship's best move, so every allowed cost is in [0, spread].
+    finite = np.where(allowed, scores, -np.inf)
+    best = finite.max(axis=1, keepdims=True)
+    best[~np.isfinite(best)] = 0
+    move_cost = np.where(allowed, best - np.where(allowed, scores, 0), 0)
+    spread = move_cost.max() + 1
+    # One fallback column per ship keeps the problem feasible, it costs more than any allowed move and less than
+    # any forbidden one.
+    unresolved = spread * (num_ships + 1)
+    forbidden = unresolved * (num_ships + 1)
+    cost = np.full((num_ships, len(cells) + num_ships), forbidden)
+    cost[:, len(cells):][np.diag_indices(num_ships)] = unresolved
+    rows = np.repeat(np.arange(num_ships), NUM_MOVES).reshape(target.shape)
+    # A ship may reach the same cell by two codes only on tiny boards, writing the cheaper last keeps it.
+    pair_cost = np.where(allowed, move_cost, forbidden)
+    order = np.argsort(-pair_cost, axis=None)
+    cost[rows.flat[order], cell_col.flat[order]] = pair_cost.flat[order]
+
+    assignment = linear_assignment(cost)
+    codes = np.full(num_ships, -1, dtype=np.int64)
+    matched = assignment < len(cells)
+    # Recover the cheapest move code reaching the matched cell
+    hit = np.where((cell_col == assignment[:, None]) & allowed, move_cost, np.inf)
+    codes[matched] = np.argmin(hit[matched], axis=1)
+    return codes
@@ -0,0 +1,224 @@
+from functools import lru_cache
+from typing import *
+
+import numpy as np
+
+from array_board import ArrayBoard
+from helper import estimate_gain_grid
+
+
+# Unit grids counted by BoardRadar.count, in the row order of BoardRadar.units
+UNIT_GRIDS = ('ally_ship', 'enemy_ship', 'ally_shipyard', 'enemy_shipyard')
+
+
+def diamond_sum(grid: np.ndarray, dis: int) -> np.ndarray:
+    """
+    Sum grid over the Manhattan diamond of radius dis around every cell, with board wraparound.
+    Each diamond is cut into 2 * dis + 1 row segments, which are read from prefix sums of the wrapped rows, so the
+    cost is O(dis * size^2) whatever the number of units. Integer grids give exact counts.
+    Note: if 2 * dis + 1 > size the diamond overlaps itself and wrapped cells are counted more than once.
+    Args:
+        grid: Array of shape (..., size, size), grid[..., row, col] is the value at observation.halite index
+            row * size + col. Leading dimensions are independent grids.
+        dis: Manhattan Distance of the diamond.
+
+    Returns: Array of the grid shape, the diamond sum around each cell.
+    """
+    size = grid.shape[-1]
+    # Wrap dis rows and columns on every side so every row segment is contiguous.
+    wrap = np.arange(-dis, size + dis) % size
+    padded = grid[..., wrap[:, None], wrap]
+    prefix = np.zeros(padded.shape[:-1] + (size + 2 * dis + 1,), dtype=np.result_type(grid, np.int64))
+    np.cumsum(padded, axis=-1, out=prefix[..., 1:])
+    total = np.zeros(grid.shape, dtype=prefix.dtype)
+    for dy in range(-dis, dis + 1):
+        # Row dy of the diamond spans columns [col - width, col + width]
+        width = dis - abs(dy)
+        rows = prefix[..., dis + dy:dis + dy + size, :]
+        total += rows[..., dis + width + 1:dis + width + 1 + size]
+        total -= rows[..., dis - width:dis - width + size]
+    return total
+
+
+class BoardRadar:
+    """
+    Radar of every cell at once, built from one player's observation for one turn.
+    Queries return flat arrays indexed like observation.halite and are computed once per radius, so the radar of a
+    unit is a lookup at unit.position.to_index(size).
+    The cell state (halite, ship and shipyard owners, ship cargo) is read from board, the ArrayBoard of the turn.
+    """
+
+    def __init__(self, obs, config):
+        self.board = board = ArrayBoard(obs, config)
+        self.size = board.size
+        self.player = board.current_player_id
+        self.collect_rate = board.configuration.collect_rate
+        self.regen_rate = board.configuration.regen_rate
+
+        # Halite of every cell, shipyard cells hold no halite same as the board cells.
+        self.halite = board.halite
+        has_ship = board.ship_owner >= 0
+        has_shipyard = board.shipyard_owner >= 0
+        ally_ship = board.ship_owner == self.player
+        ally_shipyard = board.shipyard_owner == self.player
+        grids = {
+            'ally_ship': ally_ship,
+            'enemy_ship': has_ship & ~ally_ship,
+            'ally_shipyard': ally_shipyard,
+            'enemy_shipyard': has_shipyard & ~ally_shipyard,
+        }
+        # units[UNIT_GRIDS.index(name)] is 1 on the cells holding such a unit
+        self.units = np.stack([grids[name] for name in UNIT_GRIDS]).astype(np.int64)
+        # Halite carried by the enemy ship on each cell, inf where there's none
+        self.enemy_cargo = np.where(grids['enemy_ship'], board.ship_cargo, np.inf)
+        # Cells without any ship or shipyard
+        self.free = ~has_ship & ~has_shipyard
+
+        self._cache = {}
+
+    def _cached(self, key: tuple, build: Callable[[], np.ndarray]) -> np.ndarray:
+        if key not in self._cache:
+            result = build()
+            result.setflags(write=False)
+            self._cache[key] = result
+        return self._cache[key]
+
+    def _diamond(self, values: np.ndarray, dis: int) -> np.ndarray:
+        size = self.size
+        return diamond_sum(values.reshape(values.shape[:-1] + (size, size)), dis).reshape(values.shape)
+
+    def gain(self, turns: Tuple[int, ...]) -> np.ndarray:
+        """
+        Estimated halite gain of every cell, see helper.estimate_gain_grid.
+        Returns array gain where gain[i, d, index] is estimate_gain(halite, d, turns[i]) of the cell at index, for
+        ship distance d in [0, max(turns)). Farther cells can't be reached in time and have no gain.
+        """
+        return self._cached(('gain', turns), lambda: estimate_gain_grid(
+            self.halite, np.arange(max(turns))[:, None], turns, self.collect_rate, self.regen_rate))
+
+    def halite_sum(self, dis: int) -> np.ndarray:
+        """Sum of halite within Manhattan Distance dis of every cell."""
+        return self._cached(('halite_sum', dis), lambda: self._diamond(self.halite, dis))
+
+    def count(self, unit: str, dis: int) -> np.ndarray:
+        """
+        Number of units within Manhattan Distance dis of every cell, including the cell itself.
+        Args:
+            unit: One of UNIT_GRIDS, 'ally_ship', 'enemy_ship', 'ally_shipyard' or 'enemy_shipyard'.
+            dis: Manhattan Distance.
+        """
+        counts = self._cached(('count', dis), lambda: self._diamond(self.units, dis))
+        return counts[UNIT_GRIDS.index(unit)]
+
+    def free_gain_sum(self, dis: int) -> np.ndarray:
+        """
+        Sum of estimated gain in (dis + 1) turns over the free cells (no ship or shipyard) within Manhattan Distance
+        dis of every cell, each cell weighted by its distance to the center as in the bots' radar free halite.
+        """
+        def build():
+            gain = self.gain((dis + 1,))[0] * self.free
+            # A cell at distance d counts gain[d], which is the sum of (gain[k] - gain[k + 1]) over the diamonds of
+            # radius k >= d, so one diamond sum per radius is enough.
+            steps = np.diff(gain, axis=0, append=np.zeros((1, gain.shape[1])))
+            return sum(self._diamond(-steps[k], k) for k in range(dis + 1))
+        return self._cached(('free_gain_sum', dis), build)
+
+    def threat(self, dis: int) -> np.ndarray:
+        """
+        Minimum halite carried by an enemy ship within Manhattan Distance [1, dis] of every cell, inf if there's none.
+        A ship with halite c is safe on a cell from enemies within dis when c < threat(dis)[index].
+        Computed by min-dilation over the rings of the torus, each radius from the previous one.
+        """
+        def build():
+            size = self.size
+            cargo = self.enemy_cargo.reshape(size, size)
+            threat = self.threat(dis - 1).reshape(size, size) if dis > 1 else np.full((size, size), np.inf)
+            for x, y in ring_offsets(dis):
+                # Cell (row, col) sees the cargo at (row - y, col + x)
+                threat = np.minimum(threat, np.roll(cargo, (y, -x), axis=(0, 1)))
+            return threat.reshape(-1)
+        if dis < 1:
+            raise ValueError('Threat distance must be at least 1.')
+        return self._cached(('threat', dis), build)
+
+    def summary(self, index: int, dis: int) -> Dict[str, Any]:
+        """
+        Radar summary of the cell at index, the values a UnitRadar holds before scanning.
+        """
+        summary = {'dis': dis, 'halite_sum': self.halite_sum(dis)[index]}
+        for unit in UNIT_GRIDS:
+            summary[unit + '_count'] = int(self.count(unit, dis)[index])
+        return summary
+
+
+@lru_cache(maxsize=None)
+def ring_offsets(dis: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    Offsets (x, y) at exactly Manhattan Distance dis, in the bots' radar scan order (x, then y ascending).
+    """
+    return tuple((x, y) for x in range(-dis, dis + 1) for y in sorted({abs(x) - dis, dis - abs(x)}))
+
+
+class RadarCache:
+    """
+    Turn scoped cache of radar scans keyed by (position, dis).
+    The scanned cells of a position are kept ring by ring, so a scan of a larger radius only visits the new outer
+    ring and reuses the inner rings. Results are shared between calls and must not be modified.
+    A position stands for the unit on it, which is unique within a turn, since cells are scanned relative to it.
+    """
+
+    def __init__(self) -> None:
+        self._cells: Dict[Tuple[Any, int], List[Tuple[Tuple[int, int], Any]]] = {}
+        self._scans: Dict[Tuple[Any, int], Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def cells(self, position, dis: int, scan_cell: Callable[[Tuple[int, int]], Any]) -> List[Any]:
+        """
+        Returns the records of the cells within Manhattan Distance dis of position, in radar scan order.
+        Args:
+            position: Scan center.
+            dis: Manhattan Distance.
+            scan_cell: Returns the record of the cell at a given offset from position, called once per cell.
+        """
+        return [record for _, record in self._diamond(position, dis, scan_cell)]
+
+    def _diamond(self, position, dis: int, scan_cell):
+        key = (position, dis)
+        if key not in self._cells:
+            inner = self._diamond(position, dis - 1, scan_cell) if dis > 0 else []
+            ring = [(offset, scan_cell(offset)) for offset in ring_offsets(dis)]
+            self._cells[key] = sorted(inner + ring, key=lambda item: item[0])
+        return self._cells[key]
+
+    def get(self, position, dis: int, scan: Callable[[], Any]) -> Any:
+        """
+        Returns the cached scan of (position, dis), calling scan on a miss.
+        """
+        key = (position, dis)
+        if key in self._scans:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._scans[key] = scan()
+        return self._scans[key]
+
+
+class UnitRadar(dict):
+    """
+    Radar result of one unit.
+    The summary of BoardRadar ('dis', 'halite_sum' and the '<unit>_count' values) is set on creation, the per-cell
+    detail ('halite', 'free_halite', 'ally_ship', ...) is scanned the first time one of its keys is looked up.
+    Only item lookup scans, `in` and get() see the summary alone until then.
+    """
+
+    def __init__(self, scan: Callable[[], Dict[str, Any]], summary: Dict[str, Any]) -> None:
+        super().__init__(summary)
+        self._scan = scan
+
+    def __missing__(self, key: str) -> Any:
+        if self._scan is None:
+            raise KeyError(key)
+        scan, self._scan = self._scan, None
+        self.update(scan())
+        return self[key]
@@ -0,0 +1,79 @@
+from functools import lru_cache
+from typing import *
+
+import numpy as np
+
+from array_board import move_table
+from helper import distance_table
+
+
+# Moves of a ship as (x, y) offsets, in the order navigate tries them: east-west first, then north-south.
+STEP_MOVES = ((1, 0), (-1, 0), (0, 1), (0, -1))
+# Row of each step move in array_board.move_table
+STEP_CODES = (2, 4, 1, 3)
+
+
+@lru_cache(maxsize=32)
+def shipyard_fields(sources: Tuple[int, ...], size: int) -> np.ndarray:
+    """
+    Plain distance fields of a set of shipyards, row k is the number of moves from every cell to sources[k].
+    On the torus without hazards a BFS field is a row of the distance table, so the fields are gathered once and
+    shared across turns until a shipyard is created or destroyed, which changes the sources key.
+    """
+    fields = distance_table(size)[list(sources)]
+    fields.setflags(write=False)
+    return fields
+
+
+def hazard_fields(sources: Tuple[int, ...], size: int, hazard: np.ndarray) -> np.ndarray:
+    """
+    Distance fields of a set of shipyards where entering a cell costs 1 + hazard[cell].
+    Dijkstra on a grid with non-negative costs is replaced by vectorized Bellman-Ford relaxation of all fields
+    at once, which converges in as many rounds as the longest cheapest path has moves.
+    Args:
+        sources: Shipyard indexes like observation.halite.
+        size: Board size.
+        hazard: Non-negative array indexed like observation.halite, extra cost of entering each cell.
+
+    Returns: Array of shape (len(sources), size^2), row k is the cost from every cell to sources[k].
+    """
+    step = 1 + hazard
+    neighbors = move_table(size)[list(STEP_CODES)]
+    fields = np.full((len(sources), size ** 2), np.inf)
+    fields[np.arange(len(sources)), list(sources)] = 0
+    while True:
+        # Moving from a cell to a neighbor costs entering the neighbor
+        relaxed = np.minimum(fields, (fields[:, neighbors] + step[neighbors]).min(axis=1))
+        if np.array_equal(relaxed, fields):
+            return fields
+        fields = relaxed
+
+
+class ShipyardRoutes:
+    """
+    Routes from every cell to a set of shipyards for one turn.
+    Without hazard the fields come from the shared shipyard_fields cache, with hazard they avoid the costly cells.
+    """
+
+    def __init__(self, sources: Tuple[int, ...], size: int, hazard: Optional[np.ndarray] = None) -> None:
+        self.sources = sources
+        self.size = size
+        if hazard is None or not hazard.any():
+            self.step = np.ones(size ** 2)
+            self.fields = shipyard_fields(sources, size)
+        else:
+            self.step = 1 + hazard
+            self.fields = hazard_fields(sources, size, hazard)
+
+    def nearest(self, index: int) -> int:
+        """Returns k so that sources[k] is the cheapest shipyard to reach from the cell at index."""
+        return int(np.argmin(self.fields[:, index]))
+
+    def first_moves(self, k: int, index: int) -> List[Tuple[int, int]]:
+        """
+        Returns the moves from the cell at index that start a cheapest route to sources[k], in STEP_MOVES order.
+        """
+        field = self.fields[k]
+        neighbors = move_table(self.size)[list(STEP_CODES), index]
+        cost = field[neighbors] + self.step[neighbors]
+        return [move for move, move_cost in zip(STEP_MOVES, cost) if move_cost == field[index] and field[index] > 0]
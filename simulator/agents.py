@@ -0,0 +1,44 @@
+"""
+Named agents of the repo, so games can be scheduled by name and agents built inside worker processes.
+"""
+import os
+from typing import *
+
+from bot.bronze_bot import BronzeBot
+from bot.sliver_bot import SilverBot
+from simulator.episode import Agent, bot_agent, load_agent
+
+
+SUBMISSION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'submission')
+
+# Bot classes of bot/, with the play parameters of their latest submission
+BOTS = {
+    'BronzeBot': (BronzeBot, dict(radar_dis=2, deposit_halite=500, security_dis=1, max_ship=10)),
+    'SilverBot': (SilverBot, dict(radar_dis=2, deposit_halite=300, security_dis=1, convert_sum=1500, max_ship=20)),
+}
+# Agent files of submission/
+SUBMISSIONS = sorted(name[:-3] for name in os.listdir(SUBMISSION_DIR) if name.endswith('.py'))
+AGENT_NAMES = tuple(BOTS) + tuple(SUBMISSIONS)
+
+
+def agent_source(name: str) -> Union[str, Agent]:
+    """
+    Returns a fresh agent for a bot class name ('SilverBot') or the path of the file of a submission name
+    ('SilverBot_v4'), see AGENT_NAMES.
+    """
+    if name in BOTS:
+        bot_class, play_kwargs = BOTS[name]
+        return bot_agent(bot_class, **play_kwargs)
+    if name in SUBMISSIONS:
+        return os.path.join(SUBMISSION_DIR, name + '.py')
+    raise ValueError(f'Unknown agent {name}, expected one of {", ".join(AGENT_NAMES)}.')
+
+
+def make_agent(name: str) -> Agent:
+    """
+    Build a fresh agent for one game.
+    Args:
+        name: One of AGENT_NAMES, a bot class ('SilverBot') or a submission file name ('SilverBot_v4').
+    """
+    source = agent_source(name)
+    return load_agent(source) if isinstance(source, str) else source
@@ -0,0 +1,292 @@
+"""
+Offline Halite episodes, run locally through kaggle_helpers.Board.next without kaggle_environments.
+The map generation, starting units, elimination and rewards follow the Kaggle halite interpreter.
+
+Usage:
+    from bot.sliver_bot import SilverBot
+    from simulator.episode import bot_agent, run_episode
+
+    result = run_episode(['submission/iron_player.py', bot_agent(SilverBot, max_ship=20),
+                          'submission/BronzeBot_v3.py', 'submission/SilverBot_v4.py'], seed=7)
+    result['rewards']
+"""
+import importlib.util
+import math
+import random
+import sys
+import time
+from copy import deepcopy
+from typing import *
+
+import numpy as np
+
+import kaggle_helpers
+from bot.host import AgentHost
+from kaggle_helpers import *
+
+
+# Default configuration of the Kaggle halite environment
+CONFIGURATION = {
+    'episodeSteps': 400,
+    'agentTimeout': 60,
+    'actTimeout': 6,
+    'runTimeout': 9600,
+    'startingHalite': 24000,
+    'size': 21,
+    'spawnCost': 500,
+    'convertCost': 500,
+    'moveCost': 0,
+    'collectRate': 0.25,
+    'regenRate': 0.02,
+    'maxCellHalite': 500,
+    'randomSeed': 0,
+}
+# Halite of every player at the start of a game
+STARTING_PLAYER_HALITE = 5000
+
+Agent = Callable[[Any, Any], Dict[str, str]]
+# call_agents(agents, observation, config, statuses) -> (actions, times) plays the agents' part of a turn
+CallAgents = Callable[
+    [List[Any], Dict[str, Any], Dict[str, Any], List[str]], Tuple[List[Dict[str, str]], List[float]]
+]
+
+
+class Struct(dict):
+    """
+    Dict with attribute access, the type of the obs and config given to agents by kaggle_environments.
+    Both obs.step and obs['step'] work.
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+
+def make_configuration(config: Optional[Dict[str, Any]] = None) -> Struct:
+    """Returns CONFIGURATION updated with the given values."""
+    return Struct(CONFIGURATION, **(config or {}))
+
+
+def generate_halite(size: int, starting_halite: int, seed: int) -> List[float]:
+    """
+    Starting halite of every cell, generated like the Kaggle interpreter but from its own random generators.
+    One quarter of the board is generated and mirrored horizontally and vertically, so every player sees the same
+    map around its starting ship.
+    Args:
+        size: Board size.
+        starting_halite: Total halite of the board.
+        seed: Seed of the map, the same seed gives the same map.
+
+    Returns: List indexed like observation.halite.
+    """
+    rng = random.Random(seed)
+    np_rng = np.random.RandomState(seed)
+    half = math.ceil(size / 2)
+    grid = [[0] * half for _ in range(half)]
+    # Randomly place a few halite seeds, spread over the quarter and toward the center of the map.
+    for i in range(half):
+        grid[rng.randint(0, half - 1)][rng.randint(0, half - 1)] = i ** 2
+        grid[rng.randint(half // 2, half - 1)][rng.randint(half // 2, half - 1)] = i ** 2
+
+    # Spread the seeds radially
+    radius_grid = deepcopy(grid)
+    for r in range(half):
+        for c in range(half):
+            value = grid[r][c]
+            if value == 0:
+                continue
+            radius = min(round((value / half) ** 0.5), 1)
+            for r2 in range(r - radius + 1, r + radius):
+                for c2 in range(c - radius + 1, c + radius):
+                    if 0 <= r2 < half and 0 <= c2 < half:
+                        distance = (abs(r2 - r) ** 2 + abs(c2 - c) ** 2) ** 0.5
+                        radius_grid[r2][c2] += int(value / max(1, distance) ** distance)
+
+    # Add random sprouts of halite, and more of them in the corner toward the center
+    radius_grid = np.asarray(radius_grid)
+    add_grid = np.clip(np_rng.gumbel(0, 300.0, size=(half, half)).astype(int), 0, None)
+    radius_grid += add_grid * np_rng.binomial(1, 0.5, size=(half, half))
+    corner_grid = np.clip(np_rng.gumbel(0, 500.0, size=(half // 4, half // 4)).astype(int), 0, None)
+    radius_grid[half - (half // 4):, half - (half // 4):] += corner_grid
+
+    # Normalize to the starting halite and mirror the quarter
+    total = radius_grid.sum()
+    halite = [0] * (size ** 2)
+    for r, row in enumerate(radius_grid.tolist()):
+        for c, value in enumerate(row):
+            value = int(value * starting_halite / total / 4)
+            halite[size * r + c] = value
+            halite[size * r + (size - c - 1)] = value
+            halite[size * (size - 1) - (size * r) + c] = value
+            halite[size * (size - 1) - (size * r) + (size - c - 1)] = value
+    return halite
+
+
+def starting_positions(size: int, num_agents: int) -> List[int]:
+    """Index of the starting ship of every player, like observation.halite."""
+    if num_agents == 1:
+        return [size * (size // 2) + size // 2]
+    if num_agents == 2:
+        return [size * (size // 2) + size // 4, size * (size // 2) + math.ceil(3 * size / 4) - 1]
+    if num_agents == 4:
+        return [
+            size * (size // 4) + size // 4,
+            size * (size // 4) + 3 * size // 4,
+            size * (3 * size // 4) + size // 4,
+            size * (3 * size // 4) + 3 * size // 4,
+        ]
+    raise ValueError('Halite is played by 1, 2 or 4 agents.')
+
+
+def initial_observation(config: Dict[str, Any], num_agents: int, seed: int) -> Dict[str, Any]:
+    """
+    Observation of step 0, each player has STARTING_PLAYER_HALITE and one ship on its starting position.
+    """
+    players = [
+        [STARTING_PLAYER_HALITE, {}, {f'0-{player_id + 1}': [index, 0]}]
+        for player_id, index in enumerate(starting_positions(config['size'], num_agents))
+    ]
+    return {
+        'halite': generate_halite(config['size'], config['startingHalite'], seed),
+        'players': players,
+        'player': 0,
+        'step': 0,
+    }
+
+
+def use_local_helpers() -> None:
+    """
+    Let agents written against kaggle_environments.envs.halite.helpers (all of submission/) import kaggle_helpers
+    instead, the local copy of the same module, when kaggle_environments isn't installed.
+    """
+    name = 'kaggle_environments.envs.halite.helpers'
+    if name in sys.modules:
+        return
+    try:
+        importlib.import_module(name)
+    except ImportError:
+        sys.modules[name] = kaggle_helpers
+
+
+def load_agent(path: str) -> Agent:
+    """
+    Load the agent function of an agent file, e.g. 'submission/SilverBot_v4.py'.
+    The file is executed again on every call, so module level state (like the ship states of iron_player) starts
+    fresh for each game.
+    """
+    use_local_helpers()
+    spec = importlib.util.spec_from_file_location(f'agent_{abs(hash(path))}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.agent
+
+
+def bot_agent(bot_class: type, **play_kwargs) -> AgentHost:
+    """Agent playing bot_class.play(**play_kwargs), keeping one bot per game (see bot.host.AgentHost)."""
+    return AgentHost(bot_class, **play_kwargs)
+
+
+def agent_observation(observation: Dict[str, Any], player: int) -> Struct:
+    """Copy of observation for one player, so an agent can't change what the other agents see."""
+    return Struct(
+        halite=list(observation['halite']),
+        players=deepcopy(observation['players']),
+        player=player,
+        step=observation['step'],
+    )
+
+
+def call_agents(agents: List[Agent], observation: Dict[str, Any], config: Dict[str, Any],
+                statuses: List[str]) -> Tuple[List[Dict[str, str]], List[float]]:
+    """
+    Call the active agents one after the other with their own copy of observation.
+    An agent that raises TimeoutError is marked 'TIMEOUT' in statuses, one that raises anything else or doesn't
+    return a dict is marked 'ERROR'.
+    Returns: The actions of every agent, {} if it didn't act, and the seconds of every call, nan if it didn't act.
+    """
+    actions, times = [], []
+    for player, agent in enumerate(agents):
+        action, elapsed = {}, np.nan
+        if statuses[player] == 'ACTIVE':
+            obs = agent_observation(observation, player)
+            start = time.perf_counter()
+            try:
+                action = agent(obs, config)
+            except TimeoutError:
+                statuses[player] = 'TIMEOUT'
+            except Exception:
+                statuses[player] = 'ERROR'
+            elapsed = time.perf_counter() - start
+            if not isinstance(action, dict):
+                action = {}
+                statuses[player] = 'ERROR'
+        actions.append(action)
+        times.append(elapsed)
+    return actions, times
+
+
+def run_episode(agents: List[Union[str, Agent]], seed: int = 0, config: Optional[Dict[str, Any]] = None,
+                call: CallAgents = call_agents) -> Dict[str, Any]:
+    """
+    Play one game locally, following the Kaggle halite interpreter.
+    An agent that fails (status 'ERROR' or 'TIMEOUT') has its units removed, an agent that can't gather halite
+    anymore is 'DONE' with a negative reward, and the game ends when fewer than 2 agents are active or after
+    episodeSteps - 1 turns.
+    The map and the agents' random choices are seeded, the global random and numpy.random generators are reset
+    from seed before the first turn, so a seed replays the same game.
+    Args:
+        agents: Agent functions agent(obs, config), or paths of agent files loaded with load_agent.
+        seed: Game seed.
+        config: Values overriding CONFIGURATION.
+        call: Plays the agents' part of every turn, call_agents by default (see CallAgents).
+
+    Returns: Dict with
+        'rewards': Final reward of every agent, its halite unless it's eliminated or failed (None).
+        'statuses': Final status of every agent, 'DONE', 'ERROR' or 'TIMEOUT'.
+        'steps': Number of turns played.
+        'agent_times': Array of shape (steps, num_agents), seconds of each agent call, nan if it didn't act.
+        'step_times': Array of shape (steps,), seconds of each Board.next.
+    """
+    config = make_configuration(config)
+    agents = [load_agent(agent) if isinstance(agent, str) else agent for agent in agents]
+    num_agents = len(agents)
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+
+    observation = initial_observation(config, num_agents, seed)
+    statuses = ['ACTIVE'] * num_agents
+    rewards = [STARTING_PLAYER_HALITE] * num_agents
+    agent_times, step_times = [], []
+    while True:
+        actions, times = call(agents, observation, config, statuses)
+        agent_times.append(times)
+
+        start = time.perf_counter()
+        board = Board(observation, config, actions).next()
+        observation = board.observation
+        step_times.append(time.perf_counter() - start)
+
+        for player, (player_halite, shipyards, ships) in enumerate(observation['players']):
+            if statuses[player] == 'ACTIVE' and not ships and (not shipyards or player_halite < config.spawnCost):
+                # The player can't gather any halite anymore
+                statuses[player] = 'DONE'
+                rewards[player] = board.step - config.episodeSteps - 1
+            if statuses[player] == 'ACTIVE':
+                rewards[player] = player_halite
+            elif statuses[player] != 'DONE':
+                observation['players'][player] = [0, {}, {}]
+                rewards[player] = None
+
+        num_active = statuses.count('ACTIVE')
+        if observation['step'] >= config.episodeSteps - 1 or (num_agents > 1 and num_active < 2) or num_active == 0:
+            break
+
+    return {
+        'rewards': rewards,
+        'statuses': ['DONE' if status == 'ACTIVE' else status for status in statuses],
+        'steps': len(step_times),
+        'agent_times': np.array(agent_times, dtype=float),
+        'step_times': np.array(step_times),
+    }
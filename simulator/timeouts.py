@@ -0,0 +1,134 @@
+"""
+Kaggle time limits emulated on local games, with a latency report per game.
+Every agent call is timed with a monotonic clock and checked the way the Kaggle service checks it:
+    - a call may take actTimeout seconds for free,
+    - the time over actTimeout is taken from the agent's overage budget (obs.remainingOverageTime), which starts at
+      agentTimeout seconds,
+    - the agent is marked 'TIMEOUT' when its budget drops below 0, and its action of that turn is discarded,
+    - the first call of an agent file includes loading the file.
+Calls are timed when they return, a call that never returns blocks the game here as well. runTimeout, the limit
+of a whole game, is only reported.
+
+Usage: python -m simulator.timeouts SilverBot SilverBot_v4 BronzeBot iron_player --seed 0 --time-scale 2
+"""
+import argparse
+import time
+from typing import *
+
+import numpy as np
+
+from simulator.agents import AGENT_NAMES, agent_source
+from simulator.episode import Agent, Struct, load_agent, make_configuration, run_episode
+
+
+class TimedAgent:
+    """
+    Agent wrapper keeping the Kaggle time budget of one agent for one game, see the module docstring.
+    Each call records (step, number of ships, seconds) in calls, and raises TimeoutError when the budget runs out,
+    which run_episode marks as 'TIMEOUT'.
+    """
+
+    def __init__(self, agent: Union[str, Agent], config: Dict[str, Any], time_scale: float = 1) -> None:
+        """
+        Args:
+            agent: Agent function, or the path of an agent file loaded by the first call.
+            config: Game configuration with actTimeout and agentTimeout.
+            time_scale: Factor applied to the measured times, e.g. 2 to play as on a machine twice as slow.
+        """
+        self.agent = agent
+        self.act_timeout = config['actTimeout']
+        self.remaining = float(config['agentTimeout'])
+        self.time_scale = time_scale
+        self.calls: List[Tuple[int, int, float]] = []
+
+    def __call__(self, obs, config) -> Dict[str, str]:
+        obs = Struct(obs, remainingOverageTime=max(self.remaining, 0))
+        start = time.perf_counter()
+        try:
+            if isinstance(self.agent, str):
+                self.agent = load_agent(self.agent)
+            action = self.agent(obs, config)
+        finally:
+            duration = (time.perf_counter() - start) * self.time_scale
+            self.calls.append((obs.step, len(obs.players[obs.player][2]), duration))
+            self.remaining -= max(duration - self.act_timeout, 0)
+        if self.remaining < 0:
+            raise TimeoutError(f'Step {obs.step} took {duration:.2f}s, over actTimeout and the overage budget.')
+        return action
+
+
+def run_timed_episode(agents: List[Union[str, Agent]], seed: int = 0, config: Optional[Dict[str, Any]] = None,
+                      time_scale: float = 1) -> Dict[str, Any]:
+    """
+    Play one game with the Kaggle time limits, see simulator.episode.run_episode.
+    Args:
+        agents: Agent functions agent(obs, config), or paths of agent files.
+        seed: Game seed.
+        config: Values overriding the default configuration, see simulator.episode.CONFIGURATION.
+        time_scale: Factor applied to the measured times, see TimedAgent.
+
+    Returns: The result of run_episode with
+        'calls': For every agent, the (step, number of ships, seconds) of each call.
+        'remaining_overage': Overage budget left to every agent, negative for the ones that timed out.
+        'seconds': Scaled wall time of the game.
+        'run_timeout': If the game took longer than runTimeout.
+    """
+    config = make_configuration(config)
+    timed = [TimedAgent(agent, config, time_scale) for agent in agents]
+    start = time.perf_counter()
+    result = run_episode(timed, seed, config)
+    result['seconds'] = (time.perf_counter() - start) * time_scale
+    result['run_timeout'] = result['seconds'] > config.runTimeout
+    result['calls'] = [agent.calls for agent in timed]
+    result['remaining_overage'] = [agent.remaining for agent in timed]
+    return result
+
+
+def latency_report(result: Dict[str, Any], names: Sequence[str], config: Optional[Dict[str, Any]] = None,
+                   slowest: int = 3) -> str:
+    """
+    Latency of every agent of a run_timed_episode result: call time percentiles, calls over actTimeout, overage
+    used and the slowest turns with the number of ships the agent had.
+    """
+    config = make_configuration(config)
+    lines = [
+        f'{result["steps"]} steps in {result["seconds"]:.1f}s'
+        + (f', over runTimeout {config.runTimeout}s' if result['run_timeout'] else ''),
+        f'  {"agent":<16} {"status":<8} {"calls":>5} {"mean ms":>8} {"p95 ms":>8} {"max ms":>8} {"over act":>8} '
+        f'{"overage":>8}  slowest (step, ships, ms)',
+    ]
+    for name, status, calls, remaining in zip(names, result['statuses'], result['calls'], result['remaining_overage']):
+        seconds = np.array([duration for _, _, duration in calls]) * 1000
+        over_act = sum(duration > config.actTimeout for _, _, duration in calls)
+        worst = sorted(calls, key=lambda call: -call[2])[:slowest]
+        worst = ', '.join(f'({step}, {ships}, {duration * 1000:.0f})' for step, ships, duration in worst)
+        lines.append(
+            f'  {name:<16} {status:<8} {len(calls):>5} {seconds.mean():>8.1f} {np.percentile(seconds, 95):>8.1f} '
+            f'{seconds.max():>8.1f} {over_act:>8} {config.agentTimeout - remaining:>7.2f}s  {worst}'
+        )
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Play games with the Kaggle time limits and report latencies.')
+    parser.add_argument('agents', nargs='+', choices=AGENT_NAMES, metavar='AGENT',
+                        help=f'Agent names: {", ".join(AGENT_NAMES)}.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the first game.')
+    parser.add_argument('--games', type=int, default=1, help='Number of games.')
+    parser.add_argument('--time-scale', type=float, default=1, help='Factor applied to the measured times.')
+    parser.add_argument('--act-timeout', type=float, help='actTimeout in seconds, 6 by default.')
+    parser.add_argument('--agent-timeout', type=float, help='agentTimeout (overage budget) in seconds, 60 by default.')
+    args = parser.parse_args()
+    config = {}
+    if args.act_timeout is not None:
+        config['actTimeout'] = args.act_timeout
+    if args.agent_timeout is not None:
+        config['agentTimeout'] = args.agent_timeout
+    for seed in range(args.seed, args.seed + args.games):
+        result = run_timed_episode([agent_source(name) for name in args.agents], seed, config, args.time_scale)
+        print(f'Game seed {seed}, rewards {result["rewards"]}')
+        print(latency_report(result, args.agents, config))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Round-robin tournament of named agents over a process pool, with Elo ratings updated as games finish.
+Game k always plays with seed + k and the same seats, whichever worker runs it, so a tournament can be replayed.
+
+Usage: python -m simulator.tournament SilverBot SilverBot_v4 BronzeBot iron_player --games 100 --workers 8
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import *
+
+from simulator.agents import AGENT_NAMES, make_agent
+from simulator.episode import run_episode
+
+
+def schedule(names: Sequence[str], num_games: int, seed: int = 0,
+             num_players: int = 4) -> List[Tuple[Tuple[str, ...], int]]:
+    """
+    Games of a round robin, every group of num_players agents plays in turn and the seats of a group rotate from
+    one round to the next so every agent starts from every position. With fewer agents than seats the agents are
+    repeated to fill the game.
+    Returns: List of (seats, game seed), seats[player] is the agent name of each player.
+    """
+    if len(names) >= num_players:
+        groups = list(itertools.combinations(names, num_players))
+    else:
+        groups = [tuple(itertools.islice(itertools.cycle(names), num_players))]
+    games = []
+    for game in range(num_games):
+        group = groups[game % len(groups)]
+        rotation = game // len(groups) % num_players
+        games.append((group[rotation:] + group[:rotation], seed + game))
+    return games
+
+
+def play_game(seats: Tuple[str, ...], seed: int, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Play one game in a worker process, the agents are built there from their names.
+    Returns: Dict with 'seats', 'seed', 'rewards', 'statuses', 'steps' and 'seconds' of the game.
+    """
+    start = time.perf_counter()
+    result = run_episode([make_agent(name) for name in seats], seed, config)
+    return {
+        'seats': seats,
+        'seed': seed,
+        'rewards': result['rewards'],
+        'statuses': result['statuses'],
+        'steps': result['steps'],
+        'seconds': time.perf_counter() - start,
+    }
+
+
+class EloTable:
+    """
+    Elo ratings of multiplayer games, each game counts as one match between every pair of different agents.
+    A pair's rating change is divided by the number of opponents, so a 4 player game moves ratings about as much
+    as one duel. Failed agents (reward None) rank below everyone else.
+    Games and wins count once per agent and game, even for an agent filling several seats. Rewards, eliminations
+    (negative reward) and failures count per seat, the mean reward is taken over the seats with a reward.
+    """
+
+    def __init__(self, k: float = 32, initial: float = 1500) -> None:
+        self.k = k
+        self.initial = initial
+        self.ratings: Dict[str, float] = {}
+        self.games: Dict[str, int] = {}
+        self.wins: Dict[str, int] = {}
+        self.reward_sum: Dict[str, float] = {}
+        self.rewarded: Dict[str, int] = {}
+        self.eliminated: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def update(self, seats: Sequence[str], rewards: Sequence[Optional[float]]) -> None:
+        """Update the ratings with the result of one game."""
+        scores = [-float('inf') if reward is None else reward for reward in rewards]
+        # An agent filling several seats plays one game, which it wins if any of its seats has the best score.
+        winners = {name for name, score in zip(seats, scores) if score == max(scores)}
+        for name in dict.fromkeys(seats):
+            self.ratings.setdefault(name, self.initial)
+            self.games[name] = self.games.get(name, 0) + 1
+            self.wins[name] = self.wins.get(name, 0) + (name in winners)
+        for name, reward in zip(seats, rewards):
+            self.reward_sum[name] = self.reward_sum.get(name, 0) + (0 if reward is None else reward)
+            self.rewarded[name] = self.rewarded.get(name, 0) + (reward is not None)
+            self.eliminated[name] = self.eliminated.get(name, 0) + (reward is not None and reward < 0)
+            self.errors[name] = self.errors.get(name, 0) + (reward is None)
+
+        # Changes are computed from the ratings before the game
+        delta = dict.fromkeys(seats, 0.0)
+        k = self.k / max(len(seats) - 1, 1)
+        for (name_a, score_a), (name_b, score_b) in itertools.combinations(zip(seats, scores), 2):
+            if name_a == name_b:
+                continue
+            expected = 1 / (1 + 10 ** ((self.ratings[name_b] - self.ratings[name_a]) / 400))
+            actual = 1 if score_a > score_b else 0.5 if score_a == score_b else 0
+            delta[name_a] += k * (actual - expected)
+            delta[name_b] -= k * (actual - expected)
+        for name, change in delta.items():
+            self.ratings[name] += change
+
+    def rows(self) -> List[Tuple[str, float, int, float, float, int, int]]:
+        """
+        Returns (name, rating, games, win rate, mean reward, eliminations, errors) of every agent, best rating first.
+        The mean reward is nan for an agent that failed every game.
+        """
+        return sorted(
+            ((name, rating, self.games[name], self.wins[name] / self.games[name],
+              self.reward_sum[name] / self.rewarded[name] if self.rewarded[name] else float('nan'),
+              self.eliminated[name], self.errors[name]) for name, rating in self.ratings.items()),
+            key=lambda row: -row[1],
+        )
+
+    def __str__(self) -> str:
+        lines = [f'  {"agent":<16} {"elo":>7} {"games":>6} {"win":>6} {"reward":>8} {"elim":>5} {"errors":>6}']
+        for name, rating, games, win_rate, mean_reward, eliminated, errors in self.rows():
+            lines.append(f'  {name:<16} {rating:>7.1f} {games:>6} {win_rate:>6.1%} {mean_reward:>8.0f} '
+                         f'{eliminated:>5} {errors:>6}')
+        return '\n'.join(lines)
+
+
+def run_tournament(names: Sequence[str], num_games: int, seed: int = 0, workers: Optional[int] = None,
+                   num_players: int = 4, config: Optional[Dict[str, Any]] = None, report_every: int = 10,
+                   log: Callable[[str], None] = print) -> EloTable:
+    """
+    Play the games of schedule() over a pool of worker processes, updating the ratings as each game finishes.
+    Args:
+        names: Agent names, see simulator.agents.AGENT_NAMES.
+        num_games: Number of games.
+        seed: Seed of the first game.
+        workers: Number of worker processes, all cores by default.
+        num_players: Players of each game, 2 or 4.
+        config: Values overriding the default configuration, see simulator.episode.CONFIGURATION.
+        report_every: Log the rating table every report_every games.
+        log: Called with every progress line.
+
+    Returns: EloTable of all games.
+    """
+    table = EloTable()
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(play_game, seats, game_seed, config)
+                   for seats, game_seed in schedule(names, num_games, seed, num_players)]
+        for done, future in enumerate(as_completed(futures), 1):
+            game = future.result()
+            table.update(game['seats'], game['rewards'])
+            results = ', '.join(f'{name} {reward}' for name, reward in zip(game['seats'], game['rewards']))
+            log(f'[{done}/{num_games}] seed {game["seed"]}, {game["steps"]} steps, {game["seconds"]:.1f}s: {results}')
+            if done % report_every == 0 or done == num_games:
+                elapsed = time.perf_counter() - start
+                log(f'{done} games in {elapsed:.1f}s, {done / elapsed * 60:.1f} games/min\n{table}')
+    return table
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Round-robin tournament of Halite agents.')
+    parser.add_argument('agents', nargs='+', choices=AGENT_NAMES, metavar='AGENT',
+                        help=f'Agent names: {", ".join(AGENT_NAMES)}.')
+    parser.add_argument('--games', type=int, default=100, help='Number of games.')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the first game.')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='Number of worker processes.')
+    parser.add_argument('--players', type=int, default=4, choices=(2, 4), help='Players of each game.')
+    parser.add_argument('--report-every', type=int, default=10, help='Print the ratings every n games.')
+    args = parser.parse_args()
+    run_tournament(args.agents, args.games, args.seed, args.workers, args.players, report_every=args.report_every)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+Long-lived worker processes, each hosting one named agent and serving many games over a pipe.
+The agent modules are imported and the per-size tables (distance, move and gain tables) are built once per worker,
+a new game only builds a fresh agent.
+
+Usage:
+    with WorkerPool() as pool:
+        for seed in range(100):
+            result = pool.play(('SilverBot', 'SilverBot_v4', 'BronzeBot', 'iron_player'), seed, parallel=True)
+"""
+import multiprocessing
+import os
+import pickle
+import random
+import time
+import traceback
+from functools import partial
+from multiprocessing.connection import wait
+from typing import *
+
+import numpy as np
+
+from simulator.agents import make_agent
+from simulator.episode import Struct, agent_observation, call_agents, initial_observation, make_configuration
+from simulator.episode import run_episode
+
+
+class WorkerError(RuntimeError):
+    """The agent of a worker raised, or the worker process died."""
+
+
+def serve(conn, name: str, config: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Main loop of a worker process, answers every (command, payload) request with ('ok', result) or
+    ('error', traceback). Commands:
+        'reset': Start a new game with a fresh agent, payload is (seed, player, config). The seed resets the
+            worker's random generators, player and config are used by 'turn'.
+        'act': Returns agent(obs, config) for payload (obs, config).
+        'turn': Returns the agent's actions for payload (step, halite, players), the shared part of the
+            observation of every player.
+        'ping': Returns the process id.
+        'close': Stop the worker.
+    """
+    config = make_configuration(config)
+    # Warm up on a first turn, so the imports and the tables of the board size are ready before any game.
+    # An agent failing here fails again on its first 'act', where the error is reported.
+    try:
+        make_agent(name)(agent_observation(initial_observation(config, 4, 0), 0), config)
+    except Exception:
+        pass
+    agent, player = None, None
+    while True:
+        try:
+            command, payload = conn.recv()
+        except EOFError:
+            return
+        if command == 'close':
+            return
+        try:
+            if command == 'reset':
+                seed, player, game_config = payload
+                config = make_configuration(game_config)
+                random.seed(seed)
+                np.random.seed(seed % 2 ** 32)
+                agent, result = make_agent(name), None
+            elif agent is None and command in ('act', 'turn'):
+                raise ValueError('No game started, reset first.')
+            elif command == 'act':
+                result = agent(*payload)
+            elif command == 'turn':
+                step, halite, players = payload
+                result = agent(Struct(halite=halite, players=players, player=player, step=step), config)
+            elif command == 'ping':
+                result = os.getpid()
+            else:
+                raise ValueError(f'Unknown command {command}.')
+            conn.send(('ok', result))
+        except Exception:
+            conn.send(('error', traceback.format_exc()))
+
+
+class AgentWorker:
+    """
+    Handle of a worker process hosting the agent name, usable as an agent(obs, config) function.
+    A worker that dies or doesn't answer in time is restarted, the call raises WorkerError or TimeoutError.
+    """
+
+    def __init__(self, name: str, config: Optional[Dict[str, Any]] = None, context: Optional[str] = None) -> None:
+        """
+        Args:
+            name: Agent name, see simulator.agents.AGENT_NAMES.
+            config: Configuration values of the warm-up turn, see simulator.episode.CONFIGURATION.
+            context: multiprocessing start method, 'fork', 'spawn' or 'forkserver', the platform default if None.
+        """
+        self.name = name
+        self.config = config
+        self.context = multiprocessing.get_context(context)
+        self.process = None
+        self.conn = None
+        self.restarts = 0
+        self.start()
+
+    def start(self) -> None:
+        self.conn, child_conn = self.context.Pipe()
+        self.process = self.context.Process(target=serve, args=(child_conn, self.name, self.config), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def stop(self) -> None:
+        """Kill the worker process."""
+        if self.process is not None and self.process.is_alive():
+            self.process.kill()
+        if self.process is not None:
+            self.process.join()
+        self.conn.close()
+
+    def restart(self) -> None:
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    def close(self) -> None:
+        """Ask the worker process to stop, killing it if it doesn't."""
+        if self.process.is_alive():
+            try:
+                self.conn.send(('close', None))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=1)
+        self.stop()
+
+    def request(self, command: str, payload: Any = None, timeout: Optional[float] = None) -> Any:
+        """
+        Send one request and wait for its result.
+        Args:
+            command: See serve.
+            payload: Command argument.
+            timeout: Seconds to wait for the answer, no limit if None.
+        """
+        status = result = None
+        try:
+            self.conn.send((command, payload))
+            answered = self.conn.poll(timeout)
+            if answered:
+                status, result = self.conn.recv()
+        except (EOFError, OSError):
+            answered = False
+        if not answered:
+            # A late answer would be taken as the answer of the next request, so the worker is replaced.
+            alive = self.process.is_alive()
+            self.restart()
+            if alive:
+                raise TimeoutError(f'Agent {self.name} did not answer {command} within {timeout}s.')
+            raise WorkerError(f'Worker of agent {self.name} died.')
+        if status == 'error':
+            raise WorkerError(result)
+        return result
+
+    def is_healthy(self, timeout: float = 5) -> bool:
+        """Health check, the worker process is alive and answers a ping in time."""
+        if not self.process.is_alive():
+            return False
+        try:
+            self.conn.send(('ping', None))
+            return self.conn.poll(timeout) and self.conn.recv() == ('ok', self.process.pid)
+        except (EOFError, OSError):
+            return False
+
+    def reset(self, seed: int = 0, player: int = 0, config: Optional[Dict[str, Any]] = None,
+              timeout: Optional[float] = None) -> None:
+        """
+        Start a new game, restarting the worker first if it isn't healthy.
+        Args:
+            seed: Seed of the worker's random generators.
+            player: Player of the agent in the game, the obs.player of 'turn' requests.
+            config: Configuration values of the game, see simulator.episode.CONFIGURATION.
+            timeout: Seconds to wait for the answer, no limit if None.
+        """
+        if not self.is_healthy():
+            self.restart()
+        self.request('reset', (seed, player, config), timeout)
+
+    def __call__(self, obs, config) -> Dict[str, str]:
+        return self.request('act', (obs, config))
+
+
+def call_workers(workers: List[AgentWorker], observation: Dict[str, Any], config: Dict[str, Any],
+                 statuses: List[str], timeout: Optional[float] = None) -> Tuple[List[Dict[str, str]], List[float]]:
+    """
+    Parallel turn of run_episode (see simulator.episode.CallAgents), every active agent works at the same time.
+    The shared part of the observation is pickled once and the same bytes are sent to every worker, which adds
+    its player and the game configuration given to reset. Answers are gathered as they arrive.
+    Args:
+        workers: Worker of every player, reset for the game.
+        observation: Observation of the turn.
+        config: Configuration of the game, unused since the workers got it on reset.
+        statuses: Status of every player, an agent that fails is marked 'ERROR' and one that hasn't answered
+            after timeout seconds is marked 'TIMEOUT' and its worker restarted.
+        timeout: Seconds each agent has to answer, no limit if None.
+
+    Returns: The actions of every agent, {} if it didn't act, and the seconds until every answer, nan if it
+        didn't act.
+    """
+    message = pickle.dumps(
+        ('turn', (observation['step'], observation['halite'], observation['players'])), pickle.HIGHEST_PROTOCOL)
+    actions = [{} for _ in workers]
+    times = [np.nan for _ in workers]
+    pending = {}
+    start = time.perf_counter()
+    for player, worker in enumerate(workers):
+        if statuses[player] == 'ACTIVE':
+            try:
+                worker.conn.send_bytes(message)
+                pending[worker.conn] = player
+            except OSError:
+                statuses[player] = 'ERROR'
+    deadline = None if timeout is None else start + timeout
+    while pending:
+        remaining = None if deadline is None else max(deadline - time.perf_counter(), 0)
+        ready = wait(list(pending), remaining)
+        if not ready:
+            break
+        for conn in ready:
+            player = pending.pop(conn)
+            times[player] = time.perf_counter() - start
+            try:
+                status, result = conn.recv()
+            except (EOFError, OSError):
+                status, result = 'error', None
+            if status == 'ok' and isinstance(result, dict):
+                actions[player] = result
+            else:
+                statuses[player] = 'ERROR'
+    for player in pending.values():
+        times[player] = time.perf_counter() - start
+        statuses[player] = 'TIMEOUT'
+        workers[player].restart()
+    return actions, times
+
+
+class WorkerPool:
+    """
+    Workers by agent name, kept across games. A game gets one worker per seat, so the same agent on two seats of a
+    game is served by two workers.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None, context: Optional[str] = None) -> None:
+        self.config = config
+        self.context = context
+        self.workers: Dict[str, List[AgentWorker]] = {}
+
+    def get_workers(self, seats: Sequence[str]) -> List[AgentWorker]:
+        """Returns a worker per seat, starting the missing ones."""
+        workers = []
+        for seat, name in enumerate(seats):
+            copies = self.workers.setdefault(name, [])
+            copy = seats[:seat].count(name)
+            if copy == len(copies):
+                copies.append(AgentWorker(name, self.config, self.context))
+            workers.append(copies[copy])
+        return workers
+
+    def play(self, seats: Sequence[str], seed: int = 0, parallel: bool = False,
+             timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Play one game with the pool's workers, see simulator.episode.run_episode.
+        Each worker draws from its own random generators seeded by seed, so a seed replays the same game but not
+        the game run_episode plays in one process, where the agents share the global generators.
+        Args:
+            seats: Agent name of every player.
+            seed: Game seed.
+            parallel: Call the agents of a turn at the same time (see call_workers), instead of one after the other.
+            timeout: Seconds each agent has to answer in parallel mode, no limit if None.
+        """
+        workers = self.get_workers(seats)
+        for player, worker in enumerate(workers):
+            worker.reset(seed, player, self.config)
+        call = partial(call_workers, timeout=timeout) if parallel else call_agents
+        return run_episode(workers, seed, self.config, call)
+
+    def close(self) -> None:
+        for worker in (worker for copies in self.workers.values() for worker in copies):
+            worker.close()
+        self.workers.clear()
+
+    def __enter__(self) -> 'WorkerPool':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -95,6 +95,23 @@ class SilverBot:
         self.ship_next_pos = set()
         self.ship_wait_log = {}
 
+    def update(self, obs):
+        """
+        Feed the observation of the next turn of the same game, so one bot plays a whole game and its ship
+        states carry over. States of lost ships are dropped, a ship still in CONVERT failed to convert and goes
+        back to EXPLORE.
+        """
+        self.obs = obs
+        self.board = Board(obs, self.config)
+        self.me = self.board.current_player
+        self.unit_radar = {}
+        self.ship_next_pos = set()
+        for ship_id in list(self.ship_state):
+            if ship_id not in self.board.ships:
+                del self.ship_state[ship_id]
+            elif self.ship_state[ship_id] == 'CONVERT':
+                self.ship_state[ship_id] = 'EXPLORE'
+
     def get_map(self):
         """
         In the beginning of each turn, update halite & unit map.
@@ -559,7 +576,17 @@ class SilverBot:
 ############
     
 
-def agent(obs,config):
-    bot = SilverBot(obs,config)
-    actions = bot.play(radar_dis=2, deposit_halite=300, security_dis=1, convert_sum=1500, max_ship=20)
+# One bot per player for the whole game, fed every new observation. A step that does not move forward starts a
+# new game.
+bots = {}
+last_step = {}
+
+
+def agent(obs, config):
+    if obs.player not in last_step or obs.step <= last_step[obs.player]:
+        bots[obs.player] = SilverBot(obs, config)
+    else:
+        bots[obs.player].update(obs)
+    last_step[obs.player] = obs.step
+    actions = bots[obs.player].play(radar_dis=2, deposit_halite=300, security_dis=1, convert_sum=1500, max_ship=20)
     return actions
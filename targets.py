@@ -0,0 +1,90 @@
+from typing import *
+
+import numpy as np
+
+from helper import distance_table
+from moves import linear_assignment
+from radar import BoardRadar
+
+
+def target_values(positions: np.ndarray, radar: BoardRadar, turns: int = 3) -> np.ndarray:
+    """
+    Value of sending each ship to each cell, the estimated halite gain in given turns (see helper.estimate_gain).
+    Only free cells (no ship or shipyard) and the ship's own cell have value.
+    With turns = dis + 1 these are the free_halite values of the bots' radar of distance dis.
+    Args:
+        positions: Int array of shape (num_ships,), the index of each ship like observation.halite.
+        radar: BoardRadar of the turn.
+        turns: Number of turns to reach and collect the target, the bots' radar distance + 1.
+
+    Returns: Array of shape (num_ships, size^2).
+    """
+    num_cells = radar.size ** 2
+    dis = distance_table(radar.size)[positions]
+    gain = radar.gain((turns,))[0]
+    # Cells farther than turns - 1 can't be reached and collected in time
+    value = np.where(dis < turns, gain[np.minimum(dis, turns - 1), np.arange(num_cells)], 0)
+    open_cell = radar.free[None, :] | (np.arange(num_cells)[None, :] == positions[:, None])
+    return np.where(open_cell, value, 0)
+
+
+def allocate_targets(positions: np.ndarray, radar: BoardRadar, turns: int = 3, top_k: int = 8,
+                     collecting: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Assign distinct target cells to a whole fleet, maximizing the total target value (see target_values).
+    Each ship only considers its top_k most valuable cells, so the assignment is solved over at most
+    num_ships * top_k cells whatever the board size.
+    A collecting ship keeps its own cell as target while no cell is worth more to it, like the bots' radar strategy.
+    No other ship can take that cell, so only the rest of the fleet is assigned.
+    Args:
+        positions: Int array of shape (num_ships,), the index of each ship like observation.halite.
+        radar: BoardRadar of the turn.
+        turns: Number of turns to reach and collect the target, the bots' radar distance + 1.
+        top_k: Number of candidate cells per ship.
+        collecting: Optional bool array of shape (num_ships,), True for the ships collecting on their cell.
+
+    Returns: Int array of shape (num_ships,), the target index of each ship, -1 if it has no valuable target.
+    """
+    num_ships = len(positions)
+    targets = np.full(num_ships, -1, dtype=np.int64)
+    if num_ships == 0:
+        return targets
+    value = target_values(positions, radar, turns)
+    stay = np.zeros(num_ships, dtype=bool)
+    if collecting is not None:
+        own_value = value[np.arange(num_ships), positions]
+        stay = collecting & (own_value > 0) & (own_value >= value.max(axis=1))
+    targets[stay] = positions[stay]
+    moving = np.flatnonzero(~stay)
+    if len(moving):
+        targets[moving] = _assign_targets(value[moving], top_k)
+    return targets
+
+
+def _assign_targets(value: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Assignment of allocate_targets, value[ship, index] is the value of each ship for each cell.
+    Returns the target index of each ship, -1 if it has no valuable target.
+    """
+    num_ships = len(value)
+    top_k = min(top_k, value.shape[1])
+    top = np.argpartition(-value, top_k - 1, axis=1)[:, :top_k]
+    top_value = np.take_along_axis(value, top, axis=1)
+    cells, cell_col = np.unique(top, return_inverse=True)
+    cell_col = cell_col.reshape(top.shape)
+
+    # Costs are value losses against the best candidate, a ship without target loses all of it.
+    max_value = top_value.max()
+    no_target = max_value
+    # More than leaving every ship without target, so never chosen
+    forbidden = no_target * (num_ships + 1) + 1
+    cost = np.full((num_ships, len(cells) + num_ships), forbidden)
+    cost[:, len(cells):][np.diag_indices(num_ships)] = no_target
+    rows = np.repeat(np.arange(num_ships), top_k).reshape(top.shape)
+    cost[rows, cell_col] = np.where(top_value > 0, max_value - top_value, forbidden)
+
+    assignment = linear_assignment(cost)
+    targets = np.full(num_ships, -1, dtype=np.int64)
+    matched = assignment < len(cells)
+    targets[matched] = cells[assignment[matched]]
+    return targets
@@ -0,0 +1,109 @@
+import random
+from copy import deepcopy
+
+import pytest
+
+from benchmark.common import random_observation
+from kaggle_helpers import Board, ShipAction, ShipyardAction
+from simulator.episode import make_configuration
+
+
+CONFIG = make_configuration({'size': 9, 'moveCost': 0.1})
+SHIP_CHOICES = ['NORTH', 'EAST', 'SOUTH', 'WEST', 'CONVERT', None, None]
+
+
+def random_actions(observation, rng):
+    """Random orders of every player, converts and spawns included."""
+    actions = []
+    for _, shipyards, ships in observation['players']:
+        player_actions = {ship_id: rng.choice(SHIP_CHOICES) for ship_id in ships}
+        player_actions.update((shipyard_id, rng.choice(['SPAWN', None])) for shipyard_id in shipyards)
+        actions.append({unit_id: action for unit_id, action in player_actions.items() if action})
+    return actions
+
+
+def queue_actions(board, actions):
+    """Set the next action of every unit of board from an agent response per player."""
+    actions = {unit_id: action for player_actions in actions for unit_id, action in player_actions.items()}
+    for ship in board.ships.values():
+        ship.next_action = ShipAction[actions[ship.id]] if ship.id in actions else None
+    for shipyard in board.shipyards.values():
+        shipyard.next_action = ShipyardAction[actions[shipyard.id]] if shipyard.id in actions else None
+
+
+def snapshot(board):
+    """Everything a board holds, including entity order and the links between cells, units and players."""
+    return (
+        board.observation,
+        [player.next_actions for player in board.players.values()],
+        list(board.ships),
+        list(board.shipyards),
+        [(list(player.ship_ids), list(player.shipyard_ids)) for player in board.players.values()],
+        [(cell.position, cell.halite, cell.ship_id, cell.shipyard_id) for cell in board.cells.values()],
+        [(ship.cell.ship_id, ship.player.id) for ship in board.ships.values()],
+        [(shipyard.cell.shipyard_id, shipyard.player.id) for shipyard in board.shipyards.values()],
+    )
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('seed', range(5))
+def test_nested_apply_undo_restores_the_board(seed, lazy):
+    rng = random.Random(seed)
+    observation = random_observation(seed, size=CONFIG.size, num_ships=rng.choice([4, 12, 24]), num_shipyards=3)
+    actions = random_actions(observation, rng)
+    board = Board(observation, CONFIG, actions, lazy=lazy)
+    # The first snapshot is taken on a twin, so the first apply starts from cells that were never looked up.
+    snapshots, records = [snapshot(Board(observation, CONFIG, actions, lazy=lazy))], []
+    for _ in range(4):
+        expected = board.next().observation
+        records.append(board.apply())
+        assert board.observation == expected
+        queue_actions(board, random_actions(board.observation, rng))
+        snapshots.append(snapshot(board))
+    for record, expected in zip(reversed(records), reversed(snapshots[:-1])):
+        board.undo(record)
+        assert snapshot(board) == expected
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('seed', range(5))
+def test_deepcopy_is_independent_of_the_original(seed, lazy):
+    rng = random.Random(seed)
+    observation = random_observation(seed, size=CONFIG.size, num_ships=12, num_shipyards=3)
+    actions = random_actions(observation, rng)
+    board = Board(observation, CONFIG, actions, lazy=lazy)
+    expected = snapshot(Board(observation, CONFIG, actions, lazy=lazy))
+
+    clone = deepcopy(board)
+    assert snapshot(clone) == expected
+    assert all(cell._board is clone for cell in clone.cells.values())
+    assert all(ship._board is clone for ship in clone.ships.values())
+    assert all(player._board is clone for player in clone.players.values())
+    # Playing turns on the clone leaves the original alone, and the other way around.
+    for _ in range(3):
+        clone.apply()
+        queue_actions(clone, random_actions(clone.observation, rng))
+    assert snapshot(board) == expected
+    played = snapshot(clone)
+    board.apply()
+    assert snapshot(clone) == played
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+@pytest.mark.parametrize('seed', range(5))
+def test_update_matches_a_rebuilt_board(seed, lazy):
+    rng = random.Random(seed)
+    observation = random_observation(seed, size=CONFIG.size, num_ships=12, num_shipyards=3)
+    board = Board(observation, CONFIG, lazy=lazy)
+    for _ in range(6):
+        before = {cell.position: (cell.halite, cell.ship_id, cell.shipyard_id) for cell in board.cells.values()}
+        observation = Board(observation, CONFIG, random_actions(observation, rng)).next().observation
+        actions = random_actions(observation, rng)
+        dirty_cells = board.update(observation, actions)
+        rebuilt = Board(observation, CONFIG, actions)
+        assert snapshot(board) == snapshot(rebuilt)
+        # Every cell whose units changed or whose halite dropped is dirty
+        for cell in rebuilt.cells.values():
+            halite, ship_id, shipyard_id = before[cell.position]
+            if (ship_id, shipyard_id) != (cell.ship_id, cell.shipyard_id) or cell.halite < halite:
+                assert cell.position in dirty_cells
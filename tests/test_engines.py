@@ -0,0 +1,96 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+from array_board import ArrayBoard
+from batch_board import BatchBoard
+from benchmark.common import random_observation
+from kaggle_helpers import Board
+from simulator.episode import make_configuration
+
+
+CONFIG = make_configuration({'size': 9, 'episodeSteps': 40})
+NUM_GAMES = 4
+SHIP_CHOICES = ['NORTH', 'EAST', 'SOUTH', 'WEST', 'CONVERT', None, None]
+
+
+def random_actions(observation, rng, rewards):
+    """Random orders of every player still playing (reward None), converts and spawns included."""
+    actions = []
+    for player, (_, shipyards, ships) in enumerate(observation['players']):
+        player_actions = {}
+        if rewards[player] is None:
+            player_actions.update((ship_id, rng.choice(SHIP_CHOICES)) for ship_id in ships)
+            player_actions.update((shipyard_id, rng.choice(['SPAWN', None])) for shipyard_id in shipyards)
+        actions.append({unit_id: action for unit_id, action in player_actions.items() if action})
+    return actions
+
+
+def finish_turn(observation, rewards):
+    """
+    Eliminations and end of game of Board.next games (see simulator.episode.run_episode).
+    Returns the final rewards if the game is done, None otherwise.
+    """
+    for player, (player_halite, shipyards, ships) in enumerate(observation['players']):
+        if rewards[player] is None and not ships and (not shipyards or player_halite < CONFIG.spawnCost):
+            rewards[player] = observation['step'] - CONFIG.episodeSteps - 1
+    active = [reward is None for reward in rewards]
+    if observation['step'] < CONFIG.episodeSteps - 1 and sum(active) >= 2:
+        return None
+    return [player[0] if is_active else reward
+            for player, is_active, reward in zip(observation['players'], active, rewards)]
+
+
+def batch_rewards(rewards):
+    return [math.nan if reward is None else reward for reward in rewards]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_board_and_array_board_play_the_same_games(seed):
+    rng = random.Random(seed)
+    for game in range(NUM_GAMES):
+        observation = random_observation(seed * NUM_GAMES + game, size=CONFIG.size, num_ships=8, num_shipyards=2,
+                                         step=0)
+        rewards = [None] * 4
+        while True:
+            actions = random_actions(observation, rng, rewards)
+            expected = Board(observation, CONFIG, actions).next().observation
+            assert ArrayBoard(observation, CONFIG, actions).next().observation == expected
+            observation = expected
+            if finish_turn(observation, rewards) is not None:
+                break
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_batch_board_plays_the_same_games_as_board(seed):
+    rng = random.Random(seed)
+    observations = [random_observation(seed * NUM_GAMES + game, size=CONFIG.size, num_ships=8, num_shipyards=2,
+                                       step=0) for game in range(NUM_GAMES)]
+    batch = BatchBoard(observations, CONFIG, lambda game: random_observation(size=CONFIG.size, step=0))
+    rewards = [[None] * 4 for _ in range(NUM_GAMES)]
+    playing = set(range(NUM_GAMES))
+    eliminations = 0
+    while playing:
+        expected = {}
+        for game in playing:
+            actions = random_actions(observations[game], rng, rewards[game])
+            expected[game] = Board(observations[game], CONFIG, actions).next().observation
+            batch.set_actions(game, {unit_id: action for player in actions for unit_id, action in player.items()})
+
+        done, final_rewards = batch.next()
+        for game in sorted(playing):
+            observations[game] = expected[game]
+            game_rewards = finish_turn(expected[game], rewards[game])
+            assert done[game] == (game_rewards is not None)
+            if game_rewards is None:
+                assert batch.observation(game) == expected[game]
+                # Eliminated players get their reward on the same step
+                np.testing.assert_array_equal(batch.rewards[game], batch_rewards(rewards[game]))
+            else:
+                np.testing.assert_array_equal(final_rewards[game], game_rewards)
+                eliminations += sum(reward < 0 for reward in game_rewards)
+                playing.remove(game)
+    # The random orders lose ships and shipyards, so the elimination rule is covered.
+    assert eliminations > 0
@@ -0,0 +1,15 @@
+import pytest
+
+from kaggle_helpers import Point
+
+
+def test_from_index_round_trips_every_cell():
+    size = 5
+    for index in range(size ** 2):
+        assert Point.from_index(index, size).to_index(size) == index
+
+
+@pytest.mark.parametrize('index', [-1, -25, 25, 100])
+def test_from_index_rejects_indexes_off_the_board(index):
+    with pytest.raises(IndexError):
+        Point.from_index(index, 5)
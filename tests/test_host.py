@@ -0,0 +1,44 @@
+import pytest
+
+from bot.host import AgentHost
+from kaggle_helpers import *
+from simulator.agents import BOTS
+from simulator.episode import Struct, make_configuration
+
+
+def broke_player_observation(size: int = 21) -> Struct:
+    """
+    Player 0 has one empty ship next to halite cells, one shipyard and no halite, so a CONVERT of its ship fails.
+    The cells are not rich enough for explore_command to order a CONVERT by itself.
+    """
+    halite = [0] * (size * size)
+    ship_index = 10 * size + 10
+    for neighbor in (ship_index - size, ship_index + size, ship_index - 1, ship_index + 1):
+        halite[neighbor] = 300
+    players = [
+        [0, {'0-1': 2 * size + 2}, {'0-2': [ship_index, 0]}],
+        [0, {}, {'0-3': [2 * size + 18, 0]}],
+        [0, {}, {'0-4': [18 * size + 2, 0]}],
+        [0, {}, {'0-5': [18 * size + 18, 0]}],
+    ]
+    return Struct(halite=halite, players=players, player=0, step=20)
+
+
+@pytest.mark.parametrize('bot_name', ['SilverBot', 'BronzeBot'])
+def test_ship_moves_after_failed_convert(bot_name):
+    config = make_configuration()
+    bot_class, play_kwargs = BOTS[bot_name]
+    host = AgentHost(bot_class, **play_kwargs)
+    obs = broke_player_observation(config.size)
+    actions = host(obs, config)
+
+    # The ship is ordered to CONVERT, e.g. by make_detour, but the player can't pay for it.
+    bot = host.bots[0]
+    bot.ship_state['0-2'] = 'CONVERT'
+    actions['0-2'] = 'CONVERT'
+    next_obs = Board(obs, config, [actions, {}, {}, {}]).next().observation
+    assert '0-2' in next_obs['players'][0][2]
+
+    next_actions = host(Struct(next_obs), config)
+    assert bot.ship_state['0-2'] != 'CONVERT'
+    assert next_actions.get('0-2') in ('NORTH', 'EAST', 'SOUTH', 'WEST')
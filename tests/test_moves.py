@@ -0,0 +1,50 @@
+import numpy as np
+
+from array_board import move_table
+from moves import NUM_MOVES, resolve_moves
+
+
+def next_cells(positions, codes, size):
+    return move_table(size)[codes, positions]
+
+
+def test_crowded_shipyard_ships_get_free_cells():
+    size = 21
+    shipyard = 10 * size + 10
+    north, east, south, west = move_table(size)[1:NUM_MOVES, shipyard]
+    # The ship on the spawning shipyard and the ships on two of its sides only want to stay, so the matching
+    # leaves the shipyard ship unresolved.
+    positions = np.array([shipyard, north, east])
+    scores = np.full((3, NUM_MOVES), -np.inf)
+    scores[:, 0] = 1
+    blocked = np.zeros(size ** 2, dtype=bool)
+    blocked[shipyard] = True
+
+    codes = resolve_moves(positions, scores, size, blocked)
+    assert (codes >= 0).all()
+    cells = next_cells(positions, codes, size)
+    assert len(set(cells.tolist())) == len(cells)
+    assert not blocked[cells].any()
+    assert cells[0] in (south, west)
+
+
+def test_unresolved_only_when_every_cell_is_taken():
+    rng = np.random.default_rng(0)
+    size = 7
+    for _ in range(50):
+        num_ships = rng.integers(5, 30)
+        positions = rng.choice(size ** 2, num_ships, replace=False)
+        scores = rng.random((num_ships, NUM_MOVES))
+        scores[rng.random((num_ships, NUM_MOVES)) < 0.6] = -np.inf
+        blocked = rng.random(size ** 2) < 0.1
+
+        codes = resolve_moves(positions, scores, size, blocked)
+        resolved = codes >= 0
+        cells = next_cells(positions[resolved], codes[resolved], size)
+        assert len(set(cells.tolist())) == len(cells)
+        assert not blocked[cells].any()
+        taken = np.zeros(size ** 2, dtype=bool)
+        taken[cells] = True
+        for position in positions[~resolved]:
+            reachable = move_table(size)[:NUM_MOVES, position]
+            assert (taken[reachable] | blocked[reachable]).all()
@@ -0,0 +1,32 @@
+import numpy as np
+
+from radar import BoardRadar
+from simulator.episode import make_configuration
+from targets import allocate_targets
+
+
+CONFIG = make_configuration({'size': 9})
+
+
+def radar_of(halite_cells, ship_cells):
+    """Radar of player 0 holding empty ships on ship_cells, with halite_cells (index -> halite) on the board."""
+    halite = [0.0] * CONFIG.size ** 2
+    for index, cell_halite in halite_cells.items():
+        halite[index] = cell_halite
+    ships = {f'0-{uid}': [index, 0] for uid, index in enumerate(ship_cells)}
+    observation = {'halite': halite, 'players': [[0, {}, ships], [0, {}, {}]], 'player': 0, 'step': 10}
+    return BoardRadar(observation, CONFIG)
+
+
+def test_collecting_ship_keeps_its_cell():
+    # The richer cell two moves away is only worth the trip over more turns than the radar's.
+    radar = radar_of({40: 300, 42: 500}, [40])
+    positions = np.array([40])
+    assert allocate_targets(positions, radar, collecting=np.array([True])).tolist() == [40]
+    assert allocate_targets(positions, radar, turns=6, collecting=np.array([True])).tolist() == [42]
+
+
+def test_collecting_ship_leaves_an_emptied_cell():
+    radar = radar_of({40: 10, 42: 500, 44: 400}, [40, 45])
+    targets = allocate_targets(np.array([40, 45]), radar, collecting=np.array([True, False]))
+    assert targets.tolist() == [42, 44]
@@ -0,0 +1,28 @@
+import math
+
+from simulator.tournament import EloTable
+
+
+def test_negative_rewards_and_failures_are_counted_apart():
+    table = EloTable()
+    table.update(['a', 'b', 'c', 'd'], [3000, -50, None, 0])
+    table.update(['a', 'b', 'c', 'd'], [None, 100, None, -10])
+    rows = {row[0]: row[1:] for row in table.rows()}
+
+    # (rating, games, win rate, mean reward, eliminations, errors)
+    assert rows['a'][1:] == (2, 0.5, 3000, 0, 1)
+    assert rows['b'][1:] == (2, 0.5, 25, 1, 0)
+    assert rows['d'][1:] == (2, 0, -5, 1, 0)
+    assert rows['c'][1:3] == (2, 0) and math.isnan(rows['c'][3]) and rows['c'][4:] == (0, 2)
+
+
+def test_repeated_agent_counts_one_game_per_game():
+    table = EloTable()
+    # Two agents fill the four seats, as schedule() does with fewer agents than seats.
+    table.update(['a', 'b', 'a', 'b'], [100, 300, 200, 50])
+    table.update(['a', 'b', 'a', 'b'], [400, 300, -5, None])
+    rows = {row[0]: row[1:] for row in table.rows()}
+
+    # (rating, games, win rate, mean reward, eliminations, errors)
+    assert rows['a'][1:] == (2, 0.5, (100 + 200 + 400 - 5) / 4, 1, 0)
+    assert rows['b'][1:] == (2, 0.5, (300 + 50 + 300) / 3, 0, 1)